@@ -0,0 +1,3 @@
+"""Headless tooling around the LLM-generated bouncing ball implementations."""
+
+__version__ = "0.1.0"
@@ -0,0 +1,39 @@
+"""Sweep-and-prune index over the bounding boxes of containers.
+
+Boxes are sorted once by their low edge along the axis on which the box
+centres are most spread out. A query box can only overlap boxes whose low
+edge lies within one widest-box width below its own low edge and at or
+below its high edge, so two ``searchsorted`` calls bracket the candidates.
+The other axis is then checked directly. Queries run for many boxes at
+once and return flat index pairs, like ``SpatialHash.pairs``.
+
+A spinning regular polygon always fits the square around its circumscribed
+circle, so container boxes never change and the sort is done only once.
+"""
+import numpy as np
+
+from .grid import _expand
+
+
+class AABBIndex:
+    def __init__(self, lo, hi):
+        lo, hi = np.asarray(lo, dtype=float), np.asarray(hi, dtype=float)
+        centers = (lo + hi) / 2
+        self.axis = int(np.ptp(centers, axis=0).argmax()) if len(lo) else 0
+        self.order = np.argsort(lo[:, self.axis], kind="stable")
+        self.lo, self.hi = lo[self.order], hi[self.order]
+        self.keys = self.lo[:, self.axis]
+        self.max_width = float((hi - lo)[:, self.axis].max()) if len(lo) else 0.0
+
+    def __len__(self):
+        return len(self.order)
+
+    def query(self, lo, hi):
+        """Return index arrays (q, b): query box q overlaps indexed box b."""
+        a, o = self.axis, 1 - self.axis
+        start = np.searchsorted(self.keys, lo[:, a] - self.max_width, side="left")
+        stop = np.searchsorted(self.keys, hi[:, a], side="right")
+        q, b = _expand(start, stop - start)
+        keep = ((self.hi[b, a] >= lo[q, a])
+                & (self.lo[b, o] <= hi[q, o]) & (self.hi[b, o] >= lo[q, o]))
+        return q[keep], self.order[b[keep]]
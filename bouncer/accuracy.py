@@ -0,0 +1,131 @@
+"""Instrumented headless runs: what each implementation gets wrong.
+
+Per step the harness records total mechanical energy, wall penetration,
+whether the ball is outside the container, and the number of wall contacts.
+
+Doing that arithmetic in Python every step would cost more than the step
+itself, so the hot loop only copies the raw state into a preallocated list
+through one ``operator.attrgetter`` call (``Simulation.sampler``). Every CHUNK steps the raw rows go
+through NumPy in one go and are reduced into compact per-step arrays.
+
+Units are those of ``Simulation``: pixels, seconds and radians. Energy is
+per unit mass, with potential energy measured up from the container's
+lowest point: ``E = |v|² / 2 + g (floor - y)``, y pointing down. Drift and
+energy error are fractions of ``g · 2R``, the energy of a drop across the
+container, so they compare across ports whatever their gravity or the
+ball's starting height.
+"""
+import itertools
+import math
+import time
+
+import numpy as np
+
+from .runner import run_headless
+
+CHUNK = 4096
+FIELDS = 6  # x, y, vx, vy, angle, contact count
+
+
+class Trace:
+    """Per-step metrics of one run, plus its summary."""
+
+    def __init__(self, name, steps, dt):
+        self.name = name
+        self.dt = dt
+        self.energy = np.empty(steps)
+        self.penetration = np.empty(steps, dtype=np.float32)
+        self.outside = np.empty(steps, dtype=bool)
+        self.contacts = np.empty(steps, dtype=np.uint16)
+        self.initial_energy = 0.0
+        self.scale = 1.0  # g · 2R, the unit of drift and energy error
+        self.elapsed = 0.0
+
+    def __len__(self):
+        return len(self.energy)
+
+    def summary(self) -> dict:
+        e0, scale = self.initial_energy, self.scale
+        outside = self.outside
+        escapes = int(np.count_nonzero(outside[1:] & ~outside[:-1])) + bool(outside[:1].any())
+        return {
+            "steps": len(self),
+            "energy_drift": float((self.energy[-1] - e0) / scale) if len(self) else 0.0,
+            "max_energy_error": float(np.abs(self.energy - e0).max(initial=0.0) / scale),
+            "max_penetration": float(max(0.0, self.penetration.max(initial=0.0))),
+            "escapes": escapes,
+            "outside_steps": int(np.count_nonzero(outside)),
+            "time_outside": float(np.count_nonzero(outside) * self.dt),
+            "contacts": int(self.contacts.sum(dtype=np.int64)),
+        }
+
+    def save(self, path):
+        np.savez_compressed(path, energy=self.energy, penetration=self.penetration,
+                            outside=self.outside, contacts=self.contacts,
+                            dt=self.dt, initial_energy=self.initial_energy, scale=self.scale)
+
+
+def energy(sim, y, vx, vy):
+    """Energy per unit mass, measured up from the container's lowest point."""
+    floor = sim.center[1] + sim.hex_radius
+    return 0.5 * (vx * vx + vy * vy) + sim.gravity() * (floor - y)
+
+
+def _reduce(sim, rows, trace, start, last_contacts):
+    """Turn raw sample rows into metrics for steps start .. start + len(rows)."""
+    raw = np.fromiter(itertools.chain.from_iterable(rows), float, len(rows) * FIELDS)
+    x, y, vx, vy, angle, contacts = sim.convert(raw.reshape(-1, FIELDS))
+    end = start + len(rows)
+    trace.energy[start:end] = energy(sim, y, vx, vy)
+
+    # The wall facing the ball is the one whose sector holds the ball's polar
+    # angle in the container frame; the distance past it is the projection
+    # onto that sector's normal, at half a sector from the sector start.
+    sector = 2 * math.pi / sim.sides
+    apothem = sim.hex_radius * math.cos(math.pi / sim.sides)
+    dx, dy = x - sim.center[0], y - sim.center[1]
+    off = np.mod(np.arctan2(dy, dx) - angle, sector) - sector / 2
+    depth = np.hypot(dx, dy) * np.cos(off) - apothem
+    trace.penetration[start:end] = depth + sim.ball_radius
+    trace.outside[start:end] = depth > 0
+    trace.contacts[start:end] = np.diff(contacts, prepend=last_contacts)
+    return contacts[-1]
+
+
+def run(sim, steps: int, dt: float, chunk: int = CHUNK) -> Trace:
+    """Step sim headlessly for ``steps`` steps, recording metrics."""
+    trace = Trace(sim.name, steps, dt)
+    vx, vy = sim.velocity()
+    trace.initial_energy = energy(sim, sim.position()[1], vx, vy)
+    trace.scale = max(abs(sim.gravity()) * 2 * sim.hex_radius, 1e-9)
+    sample, step = sim.sampler(), sim.step
+    rows = [None] * chunk
+    last_contacts = sim.contacts
+
+    begin = time.perf_counter()
+    for start in range(0, steps, chunk):
+        n = min(chunk, steps - start)
+        for i in range(n):
+            step(dt)
+            rows[i] = sample(sim)
+        last_contacts = _reduce(sim, rows[:n], trace, start, last_contacts)
+    trace.elapsed = time.perf_counter() - begin
+    return trace
+
+
+def overhead(make, steps: int, dt: float) -> float:
+    """Fractional cost of recording, from two fresh simulations."""
+    plain = run_headless(make(), steps, dt)
+    instrumented = run(make(), steps, dt).elapsed
+    return instrumented / plain - 1 if plain else 0.0
+
+
+def report(summaries):
+    """Format {name: summary} as a table."""
+    lines = [f"{'impl':12s} {'drift':>9s} {'max |dE|':>10s} {'max pen':>9s} "
+             f"{'escapes':>7s} {'outside s':>9s} {'contacts':>8s}"]
+    for name, s in summaries.items():
+        lines.append(f"{name:12s} {s['energy_drift']:+9.3f} {s['max_energy_error']:10.3g} "
+                     f"{s['max_penetration']:9.1f} {s['escapes']:7d} "
+                     f"{s['time_outside']:9.1f} {s['contacts']:8d}")
+    return "\n".join(lines)
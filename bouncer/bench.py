@@ -0,0 +1,212 @@
+"""Micro- and macro-benchmarks of the physics hot paths.
+
+Micro cases time the vertex generators and collision routines of the
+individual scripts; macro cases time a whole step of each implementation
+and of the vectorized engine. Each case is called in batches long enough
+to swamp timer resolution, warmed up until the batch time settles, then
+sampled. A macro case is a ``Stepper``, which goes back to the same
+starting state before every batch, so every sample, and every run being
+compared, times the same stretch of the simulation. Results can be saved
+as a JSON baseline and compared against a later run to catch regressions.
+"""
+import json
+import math
+import pickle
+import platform
+import statistics
+import time
+
+from . import impls
+
+TARGET_BATCH = 0.005  # seconds per timed batch
+WARMUP_TIME = 0.2  # seconds; upper bound on warm-up
+SAMPLES = 50
+
+
+class Stepper:
+    """Calls step one simulation by dt, from the state it was given.
+
+    A simulation stepped through a whole benchmark drifts (balls settle or
+    escape), so later samples would time a different state than earlier
+    ones. ``reset`` restores the starting state; ``batch`` calls it before
+    timing.
+    """
+
+    def __init__(self, sim, dt=1 / 60):
+        self.dt = dt
+        self._state = pickle.dumps(sim, pickle.HIGHEST_PROTOCOL)
+        self.reset()
+
+    def reset(self):
+        self.sim = pickle.loads(self._state)
+        self._step = self.sim.step
+
+    def __call__(self):
+        self._step(self.dt)
+
+
+def calibrate(func):
+    """Calls per batch so that one batch takes about TARGET_BATCH."""
+    number = 1
+    reset = getattr(func, "reset", None)
+    while True:
+        if reset:
+            reset()
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        elapsed = time.perf_counter() - start
+        if elapsed >= TARGET_BATCH or number >= 1 << 24:
+            return number
+        number = max(number * 2, int(number * TARGET_BATCH / max(elapsed, 1e-9)))
+
+
+def batch(func, number):
+    reset = getattr(func, "reset", None)
+    if reset:
+        reset()
+    start = time.perf_counter_ns()
+    for _ in range(number):
+        func()
+    return (time.perf_counter_ns() - start) / number
+
+
+def run_case(func, samples=SAMPLES):
+    """Time func; return per-call statistics in nanoseconds."""
+    number = calibrate(func)
+
+    # Warm up until two consecutive batch medians agree within 2%
+    deadline = time.perf_counter() + WARMUP_TIME
+    previous = None
+    while time.perf_counter() < deadline:
+        current = statistics.median(batch(func, number) for _ in range(5))
+        if previous is not None and abs(current - previous) <= 0.02 * previous:
+            break
+        previous = current
+
+    times = sorted(batch(func, number) for _ in range(samples))
+    median = statistics.median(times)
+    return {
+        "median_ns": median,
+        "p99_ns": times[min(len(times) - 1, math.ceil(0.99 * len(times)) - 1)],
+        "min_ns": times[0],
+        "ops_per_sec": 1e9 / median if median else math.inf,
+        "calls_per_sample": number,
+        "samples": samples,
+    }
+
+
+def micro_cases():
+    """(name, callable) pairs for the individual hot-path functions."""
+    from .geometry import RegularPolygon
+    from .impls import claude, deepseek_r1, gemini_2_0, gpt4o, o3_mini, perplexity
+
+    center = (400, 300)
+    # A ball resting against the lower right edge of an unrotated hexagon,
+    # so the collision routines take their contact branch
+    a, b = (600.0, 300.0), (500.0, 300 + 100 * math.sqrt(3))
+    contact = (552.0, 381.0)
+
+    hexagon = claude.Hexagon(400, 300, 200)
+    claude_vertices = hexagon.get_vertices()
+
+    def claude_check_collision():
+        ball = claude.Ball(*contact)
+        ball.vel[:] = (3.0, 3.0)
+        claude.check_collision(ball, claude_vertices)
+
+    hex_shape = perplexity.Hexagon(400, 300, 200)
+    polygon = RegularPolygon(6, 200)
+    # A 1024-gon standing in for a circle, with a ball pressed into it
+    circle = RegularPolygon(1024, 200)
+    pressed = (400 + 195 * math.cos(1.0), 300 + 195 * math.sin(1.0))
+    return [
+        ("vertices/4o.get_hexagon_points",
+         lambda: gpt4o.get_hexagon_points(center, 200, 30)),
+        ("vertices/claude.Hexagon.get_vertices", hexagon.get_vertices),
+        ("vertices/deepseek-r1.get_hex_vertices",
+         lambda: deepseek_r1.get_hex_vertices(center, 200, 0.5)),
+        ("vertices/o3-mini.compute_hexagon_vertices",
+         lambda: o3_mini.compute_hexagon_vertices(center, 250, 0.5)),
+        ("collision/4o.reflect_ball",
+         lambda: gpt4o.reflect_ball(list(contact), [3.0, 3.0], a, b)),
+        ("collision/claude.check_collision", claude_check_collision),
+        ("collision/deepseek-r1.closest_point_on_segment",
+         lambda: deepseek_r1.closest_point_on_segment(a, b, contact)),
+        ("collision/o3-mini.line_collision_response",
+         lambda: o3_mini.line_collision_response(contact, (3.0, 3.0), a, b, center)),
+        ("collision/gemini-2.0.ball_collision",
+         lambda: gemini_2_0.ball_collision(*contact, 3.0, 3.0, center, 150, 0)),
+        ("collision/perplexity.check_collision",
+         lambda: perplexity.check_collision(perplexity.Ball(*contact, 15), hex_shape)),
+        ("collision/perplexity.line_circle_collision",
+         lambda: perplexity.line_circle_collision(a, b, contact, 15)),
+        ("collision/geometry.RegularPolygon.collide_one",
+         lambda: polygon.collide_one(*contact, 3.0, 3.0, center, 0.0, 0.5, 10, 0.8)),
+        ("collision/geometry.RegularPolygon.collide_one[1024]",
+         lambda: circle.collide_one(*pressed, 3.0, 3.0, center, 0.0, 0.5, 10, 0.8)),
+    ]
+
+
+def macro_cases(engine_balls=(1_000, 100_000)):
+    """(name, factory) pairs for one full physics step.
+
+    A factory builds the case's ``Stepper``; a 100,000-ball engine is not
+    worth building for a run that filters it out.
+    """
+    from .engine import BallEngine
+
+    cases = [(f"step/{name}", lambda name=name: Stepper(impls.create(name)))
+             for name in impls.IMPLEMENTATIONS]
+    for n in engine_balls:
+        cases.append((f"step/engine[{n}]", lambda n=n: Stepper(BallEngine(n, seed=0))))
+    return cases
+
+
+def run(pattern="", samples=SAMPLES, progress=None):
+    """Run every case whose name contains pattern; return a baseline dict.
+
+    Raises ValueError if no case matches, rather than returning an empty
+    baseline that any later run would compare clean against.
+    """
+    cases = [(name, lambda func=func: func) for name, func in micro_cases()] + macro_cases()
+    results = {}
+    for name, factory in cases:
+        if pattern in name:
+            results[name] = run_case(factory(), samples)
+            if progress:
+                progress(name, results[name])
+    if not results:
+        raise ValueError(f"no benchmark case matches {pattern!r}")
+    return {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "results": results,
+    }
+
+
+def save(baseline, path):
+    with open(path, "w") as f:
+        json.dump(baseline, f, indent=1)
+
+
+def load(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def compare(old, new, threshold=10.0):
+    """Cases whose median got more than threshold percent slower.
+
+    Returns (name, old_ns, new_ns, change_percent) tuples.
+    """
+    regressions = []
+    for name, result in new["results"].items():
+        before = old["results"].get(name)
+        if before is None:
+            continue
+        change = 100.0 * (result["median_ns"] / before["median_ns"] - 1)
+        if change > threshold:
+            regressions.append((name, before["median_ns"], result["median_ns"], change))
+    return regressions
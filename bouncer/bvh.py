@@ -0,0 +1,86 @@
+"""Bounding-volume hierarchy over line segments.
+
+The tree is built once, top down: each node's segments are split at the
+median centroid along the longer side of their centroid bounds, until a
+node holds at most LEAF_SIZE segments. Nodes are stored in flat arrays
+(bounds, children, and the range of ``order`` that a leaf covers), so a
+query walks the tree for many boxes at once. The frontier of (box, node)
+pairs is filtered by overlap and replaced by the children of the survivors,
+one level per NumPy pass, until only leaves are left. A box that touches a
+handful of segments costs O(log S) node tests rather than S segment tests.
+
+Segments are given in the container's own frame, where they never move; a
+spinning container turns its balls into that frame rather than rebuilding
+the tree.
+"""
+import numpy as np
+
+from .grid import _expand
+
+LEAF_SIZE = 4
+
+
+class SegmentBVH:
+    def __init__(self, a, b, leaf_size=LEAF_SIZE):
+        """Index segments a[i] -> b[i], both (S, 2)."""
+        self.a = np.asarray(a, dtype=float)
+        self.b = np.asarray(b, dtype=float)
+        seg_lo, seg_hi = np.minimum(self.a, self.b), np.maximum(self.a, self.b)
+        centroid = (self.a + self.b) / 2
+
+        # One row per node: bounds lo and hi, children, leaf range of order
+        nodes = [[None, None, -1, -1, 0, 0]]
+        order = np.arange(len(self.a))
+        stack = [(0, 0, len(order))]  # (node, start, stop) ranges of order to split
+        while stack:
+            node, start, stop = stack.pop()
+            idx = order[start:stop]
+            row = nodes[node]
+            row[0] = seg_lo[idx].min(axis=0) if len(idx) else np.zeros(2)
+            row[1] = seg_hi[idx].max(axis=0) if len(idx) else np.zeros(2)
+            if stop - start <= leaf_size:
+                row[4], row[5] = start, stop - start
+                continue
+            c = centroid[idx]
+            axis = int(np.ptp(c, axis=0).argmax())
+            mid = start + (stop - start) // 2
+            order[start:stop] = idx[np.argpartition(c[:, axis], mid - start)]
+            for slot, (s, e) in ((2, (start, mid)), (3, (mid, stop))):
+                row[slot] = len(nodes)
+                stack.append((len(nodes), s, e))
+                nodes.append([None, None, -1, -1, 0, 0])
+
+        self.order = order
+        lo, hi, left, right, first, count = zip(*nodes)
+        self.lo, self.hi = np.array(lo), np.array(hi)
+        self.left, self.right = np.array(left), np.array(right)
+        self.first, self.count = np.array(first), np.array(count)
+        self.leaf_size = leaf_size
+
+    def __len__(self):
+        return len(self.a)
+
+    @property
+    def nodes(self):
+        return len(self.lo)
+
+    def query(self, lo, hi):
+        """Return index arrays (q, s): query box q overlaps the bounds of segment s."""
+        lo, hi = np.asarray(lo, dtype=float), np.asarray(hi, dtype=float)
+        q = np.arange(len(lo))
+        node = np.zeros(len(lo), dtype=np.intp)
+        found_q, found_s = [], []
+        while len(q):
+            keep = np.all((self.lo[node] <= hi[q]) & (self.hi[node] >= lo[q]), axis=1)
+            q, node = q[keep], node[keep]
+            leaf = self.left[node] < 0
+            group, slot = _expand(self.first[node[leaf]], self.count[node[leaf]])
+            found_q.append(q[leaf][group])
+            found_s.append(self.order[slot])
+            q, node = q[~leaf], node[~leaf]
+            q, node = np.concatenate((q, q)), np.concatenate((self.left[node], self.right[node]))
+
+        q, s = np.concatenate(found_q), np.concatenate(found_s)
+        a, b = self.a[s], self.b[s]
+        keep = np.all((np.minimum(a, b) <= hi[q]) & (np.maximum(a, b) >= lo[q]), axis=1)
+        return q[keep], s[keep]
@@ -0,0 +1,44 @@
+"""On-disk cache of JSON results, one file per key."""
+import hashlib
+import json
+import os
+from pathlib import Path
+
+CACHE_DIR = Path(".bouncer-cache")
+
+
+def digest(*parts) -> str:
+    """Stable hash of strings, bytes and JSON-serialisable values."""
+    h = hashlib.sha256()
+    for part in parts:
+        if isinstance(part, str):
+            part = part.encode()
+        elif not isinstance(part, bytes):
+            part = json.dumps(part, sort_keys=True).encode()
+        h.update(len(part).to_bytes(8, "little"))
+        h.update(part)
+    return h.hexdigest()
+
+
+class ResultCache:
+    def __init__(self, root=CACHE_DIR, namespace="results"):
+        self.root = Path(root) / namespace
+
+    def path(self, key: str) -> Path:
+        return self.root / key[:2] / f"{key}.json"
+
+    def get(self, key: str):
+        try:
+            with open(self.path(key)) as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def put(self, key: str, value):
+        path = self.path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Write then rename so an interrupted run never leaves half a file
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp, "w") as f:
+            json.dump(value, f)
+        os.replace(tmp, path)
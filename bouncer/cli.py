@@ -0,0 +1,636 @@
+"""Command line entry point: ``python -m bouncer <command> ...``."""
+import argparse
+import sys
+from fractions import Fraction
+from pathlib import Path
+
+from . import impls
+from .runner import run_headless, run_window
+
+
+def parse_dt(text: str) -> float:
+    """Accept a plain number or a fraction such as ``1/60``."""
+    try:
+        return float(Fraction(text))
+    except (ValueError, ZeroDivisionError):
+        raise argparse.ArgumentTypeError(f"invalid timestep {text!r}") from None
+
+
+def positive_int(text: str) -> int:
+    """An integer of at least 1."""
+    try:
+        value = int(text)
+    except ValueError:
+        value = 0
+    if value < 1:
+        raise argparse.ArgumentTypeError(f"expected a positive integer, got {text!r}")
+    return value
+
+
+def impl_names(name: str):
+    return list(impls.IMPLEMENTATIONS) if name == "all" else [name]
+
+
+def show_window(sim, args):
+    if not args.threaded:
+        run_window(sim, args.dt, args.steps, args.fps, args.substeps,
+                   not args.full_redraw, args.hud, args.profile_out, args.govern,
+                   args.heatmap)
+        return
+    from .threaded import run_threaded
+
+    r = run_threaded(sim, args.dt, args.steps, args.fps, args.substeps,
+                     not args.full_redraw, args.render_delay / 1000)
+    if "rate_hz" in r:
+        print(f"{sim.name}: physics {r['ticks']} ticks at {r['rate_hz']:.1f} Hz "
+              f"(target {1 / args.dt:.1f}), tick interval p50 {r['interval_p50_ms']:.2f} ms "
+              f"p99 {r['interval_p99_ms']:.2f} ms max {r['interval_max_ms']:.2f} ms, "
+              f"{r['late']} late; render {r['render_fps']:.1f} fps")
+
+
+def cmd_run(args):
+    for name in impl_names(args.impl):
+        sim = impls.create(name)
+        if not args.headless:
+            show_window(sim, args)
+            continue
+        steps = args.steps or 100_000
+        elapsed = run_headless(sim, steps, args.dt)
+        x, y = sim.position()
+        rate = steps / elapsed if elapsed else float("inf")
+        print(f"{name:12s} {steps} steps in {elapsed:.3f}s "
+              f"({rate:,.0f} steps/s)  ball=({x:.1f}, {y:.1f})")
+
+
+def cmd_crowd(args):
+    if args.workers:
+        return crowd_sharded(args)
+    from .engine import BallEngine
+
+    engine = BallEngine(args.balls, sides=args.sides, ball_radius=args.ball_radius,
+                        ball_collisions=args.ball_collisions,
+                        cell_size=args.cell_size, ccd=args.ccd, sleep=args.sleep,
+                        integrator=args.integrator, damping=args.damping, seed=args.seed)
+    if args.window:
+        show_window(engine, args)
+        return
+    elapsed = run_headless(engine, args.steps, args.dt)
+    rate = args.steps / elapsed if elapsed else float("inf")
+    print(f"{args.balls} balls, {args.steps} steps in {elapsed:.3f}s "
+          f"({rate:,.1f} steps/s, {rate * args.balls:,.0f} ball-steps/s)  "
+          f"wall contacts={engine.contacts}")
+    if args.sleep:
+        print(f"{engine.asleep.sum()} of {args.balls} balls asleep at the end")
+    if engine.grid is not None:
+        print(f"grid {engine.grid.cols}x{engine.grid.rows} cells of "
+              f"{engine.grid.cell_size:g}px: {engine.grid.candidates} candidate "
+              f"pairs, {engine.grid.contacts} ball contacts")
+
+
+def crowd_sharded(args):
+    from .shard import ShardedEngine
+
+    if args.ball_collisions:
+        sys.exit("--workers needs wall-only physics; drop --ball-collisions")
+    with ShardedEngine(args.balls, args.workers, sides=args.sides, ball_radius=args.ball_radius,
+                       ccd=args.ccd, sleep=args.sleep, integrator=args.integrator,
+                       damping=args.damping, seed=args.seed) as engine:
+        if args.window:
+            show_window(engine, args)
+            return
+        elapsed = engine.run(args.steps, args.dt)
+        rate = args.steps / elapsed if elapsed else float("inf")
+        print(f"{args.balls} balls on {engine.workers} workers, {args.steps} steps in "
+              f"{elapsed:.3f}s ({rate:,.1f} steps/s, {rate * args.balls:,.0f} ball-steps/s)  "
+              f"wall contacts={engine.contacts}")
+
+
+def cmd_integrators(args):
+    from .integrate import SCHEMES, energy_error, max_dt
+
+    options = {"seconds": args.seconds, "balls": args.balls, "seed": args.seed,
+               "ccd": args.ccd}
+    print(f"energy error as a fraction of a drop across the hexagon; largest dt on the "
+          f"ladder within {args.tolerance:g}")
+    print(f"{'scheme':14s} {'free @dt':>9s} {'walls @dt':>9s} {'max dt free':>11s} "
+          f"{'max dt walls':>12s}")
+    for name in SCHEMES:
+        free = energy_error(name, args.dt, walls=False, **options)
+        walls = energy_error(name, args.dt, **options)
+        best = [max_dt(name, args.tolerance, walls=w, **options)[0] for w in (False, True)]
+        shown = [f"1/{1 / dt:g}" if dt else "-" for dt in best]
+        print(f"{name:14s} {free:9.2g} {walls:9.2g} {shown[0]:>11s} {shown[1]:>12s}")
+
+
+def cmd_world(args):
+    from .world import grid_scene, show
+
+    world = grid_scene(args.cols, args.rows, args.cell, args.balls, seed=args.seed)
+    if args.window:
+        show(world, args.dt, args.steps, args.fps)
+        return
+    elapsed = run_headless(world, args.steps, args.dt)
+    rate = args.steps / elapsed if elapsed else float("inf")
+    print(f"{len(world.containers)} containers, {len(world)} balls, {args.steps} steps "
+          f"in {elapsed:.3f}s ({rate:,.1f} steps/s)")
+    print(f"{world.candidates / max(len(world), 1):.2f} candidate containers per ball, "
+          f"{world.contacts} wall contacts in the last step, {world.transfers} transfers, "
+          f"{(world.home >= 0).sum()} balls inside a container")
+
+
+def cmd_heatmap(args):
+    import time
+
+    from .export import write_png
+    from .heatmap import FRAMES, Heatmap
+
+    if args.balls:
+        from .engine import BallEngine
+
+        sim = BallEngine(args.balls, ball_radius=args.ball_radius, seed=args.seed)
+    else:
+        sim = impls.create(args.impl)
+    heat = Heatmap(sim.center, cell=args.cell)
+    step, state, add = sim.step, sim.render_state, heat.add
+    start = time.perf_counter()
+    for _ in range(args.steps):
+        step(args.dt)
+        add(*state())
+    heat.save(args.out)
+    elapsed = time.perf_counter() - start
+    print(f"{sim.name}: {heat.samples:,} positions over {args.steps} steps in {elapsed:.3f}s, "
+          f"{heat.rows}x{heat.cols} cells of {args.cell}px, counts in {args.out}")
+    if args.png:
+        for frame in FRAMES:
+            path = Path(args.out).with_name(f"{Path(args.out).stem}_{frame}.png")
+            write_png(path, heat.colors(frame))
+            print(f"{frame} frame: {path}")
+
+
+def cmd_outline(args):
+    from .outline import SHAPES, Outline, OutlineEngine, show
+
+    outline = Outline.load(args.file) if args.file else SHAPES[args.shape]()
+    if args.save:
+        outline.save(args.save)
+    spin = {} if args.omega is None else {"omega": args.omega}
+    engine = OutlineEngine(outline, args.balls, ball_radius=args.ball_radius,
+                           seed=args.seed, **spin)
+    if args.window:
+        show(engine, args.dt, args.steps, args.fps)
+        return
+    elapsed = run_headless(engine, args.steps, args.dt)
+    rate = args.steps / elapsed if elapsed else float("inf")
+    outside = (~outline.contains(engine.to_local(engine.pos, engine.angle))).sum()
+    print(f"{len(outline)} segments ({outline.bvh.nodes} BVH nodes), {args.balls} balls, "
+          f"{args.steps} steps in {elapsed:.3f}s ({rate:,.1f} steps/s)")
+    print(f"{engine.candidates} candidate segments in the last step "
+          f"(brute force: {len(outline) * args.balls}), {engine.contacts} wall contacts, "
+          f"{outside} balls outside")
+
+
+def cmd_matrix(args):
+    import json
+
+    from .matrix import run_matrix, summarize
+
+    def progress(done, total):
+        print(f"\r{done}/{total} cases", end="", file=sys.stderr, flush=True)
+
+    records = run_matrix(impl_names(args.impl), steps=args.steps, dt=args.dt,
+                         workers=args.workers, progress=progress)
+    print(file=sys.stderr)
+    cached = sum(r["cached"] for r in records)
+    print(f"{len(records)} cases, {cached} from cache")
+    print(f"{'impl':12s} {'cases':>5s} {'steps/s':>10s} {'escaped':>8s} "
+          f"{'drift':>9s} {'max pen':>9s}")
+    for row in summarize(records):
+        print(f"{row['impl']:12s} {row['cases']:5d} {row['steps_per_sec']:10,.0f} "
+              f"{row['escaped_cases']:8d} {row['energy_drift']:+9.3f} "
+              f"{row['max_penetration']:9.1f}")
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(records, f, indent=1)
+
+
+def parse_range(text: str):
+    """``LOW:HIGH`` as a pair of floats."""
+    try:
+        low, high = (float(Fraction(v)) for v in text.split(":"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected LOW:HIGH, got {text!r}") from None
+    return low, high
+
+
+def cmd_escape(args):
+    import json
+
+    from .montecarlo import run_study
+
+    def progress(aggregate, done, total):
+        s = aggregate.summary(args.dt)
+        print(f"\r{done}/{total} chunks  {aggregate.name}: {s['escapes']}/{s['trials']} "
+              f"escaped ({s['ci_low']:.1%}-{s['ci_high']:.1%})\033[K",
+              end="", file=sys.stderr, flush=True)
+
+    try:
+        aggregates = run_study(impl_names(args.impl), args.trials, args.steps, args.dt,
+                               args.seed, args.speed, args.omega, args.chunk, args.bins,
+                               args.workers, progress=progress)
+    except KeyboardInterrupt:
+        print("\ninterrupted; finished chunks are cached, rerun to resume", file=sys.stderr)
+        return 130
+    print(file=sys.stderr)
+    summaries = [a.summary(args.dt) for a in aggregates.values()]
+    print(f"{'impl':12s} {'trials':>6s} {'escaped':>7s} {'rate':>6s} {'95% CI':>15s} "
+          f"{'median s':>8s} {'mean s':>14s}")
+    for s in summaries:
+        timing = (f"{s['median_escape_s']:8.2f} {s['mean_escape_s']:7.2f} "
+                  f"± {s['mean_escape_ci_s']:4.2f}" if s["escapes"] else "")
+        print(f"{s['impl']:12s} {s['trials']:6d} {s['escapes']:7d} {s['rate']:6.1%} "
+              f"{s['ci_low']:6.1%} - {s['ci_high']:6.1%} {timing}")
+        for axis, unit in (("by_speed", "px/s"), ("by_omega", "rad/s")):
+            for b in s.get(axis, []):
+                print(f"    {b['low']:7.1f}-{b['high']:7.1f} {unit:5s} {b['trials']:5d} "
+                      f"{b['rate']:6.1%} ({b['ci_low']:.1%} - {b['ci_high']:.1%})")
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(summaries, f, indent=1)
+
+
+def cmd_bench(args):
+    from . import bench
+
+    def progress(name, r):
+        print(f"{name:50s} median {r['median_ns'] / 1e3:10.2f} us  "
+              f"p99 {r['p99_ns'] / 1e3:10.2f} us  {r['ops_per_sec']:14,.0f} ops/s")
+
+    try:
+        baseline = bench.run(args.filter, args.samples, progress)
+    except ValueError as e:
+        sys.exit(str(e))
+    if args.out:
+        bench.save(baseline, args.out)
+    if args.compare:
+        regressions = bench.compare(bench.load(args.compare), baseline, args.threshold)
+        for name, before, after, change in regressions:
+            print(f"REGRESSION {name}: {before / 1e3:.2f} us -> "
+                  f"{after / 1e3:.2f} us ({change:+.1f}%)")
+        return 1 if regressions else 0
+
+
+def cmd_accuracy(args):
+    from . import accuracy
+
+    summaries = {}
+    for name in impl_names(args.impl):
+        trace = accuracy.run(impls.create(name), args.steps, args.dt)
+        summaries[name] = trace.summary()
+        if args.save:
+            trace.save(f"{args.save}-{name}.npz")
+        if args.overhead:
+            cost = accuracy.overhead(lambda: impls.create(name), args.steps, args.dt)
+            print(f"{name}: recording overhead {cost:+.1%}", file=sys.stderr)
+    print(accuracy.report(summaries))
+
+
+def cmd_record(args):
+    import time
+
+    from .recorder import record
+
+    start = time.perf_counter()
+    count = record(impls.create(args.impl), args.out, args.steps, args.dt)
+    elapsed = time.perf_counter() - start
+    print(f"{count} steps of {args.impl} written to {args.out} in {elapsed:.3f}s "
+          f"({count / elapsed:,.0f} steps/s)")
+
+
+def cmd_replay(args):
+    from .recorder import Trajectory, replay
+
+    if args.info:
+        traj = Trajectory(args.path)
+        print(traj.meta)
+        if len(traj):
+            r = traj[args.start]
+            print({name: r[name].item() for name in r.dtype.names})
+        return
+    replay(args.path, args.start, args.fps)
+
+
+def cmd_fork(args):
+    from . import snapshot
+
+    if args.load:
+        snap = snapshot.load(args.load)
+    else:
+        snap = snapshot.advance(impls.create(args.impl), args.at, args.dt)
+    if args.save:
+        snapshot.save(snap, args.save)
+    x, y, vx, vy = snap.balls[0]
+    print(f"{snap.impl} at step {snap.steps} ({snap.time:.2f}s): angle {snap.angle:.3f} rad, "
+          f"spin {snap.omega:.3f} rad/s, ball ({x:.1f}, {y:.1f}) moving ({vx:.1f}, {vy:.1f}) px/s")
+    if not args.branches:
+        return
+    branches = snapshot.perturbations(args.branches, args.seed, args.position, args.speed,
+                                      args.omega)
+    rows = snapshot.fork(snap, branches, args.steps, args.dt, args.workers)
+    s = snapshot.summary(rows, args.dt)
+    control = (f"escapes at +{s['control_escape'] * args.dt:.2f}s" if s["control_escape"] >= 0
+               else "stays in")
+    median = f" (median +{s['median_escape_s']:.2f}s)" if s["escaped"] else ""
+    print(f"{s['escaped']} of {s['branches']} branches escape within {args.steps} steps"
+          f"{median}; the unperturbed branch {control}; "
+          f"worst penetration {s['max_penetration']:.1f}px")
+
+
+def cmd_export(args):
+    from .export import export
+
+    count = round(args.seconds * args.fps)
+    for name in impl_names(args.impl):
+        out = Path(args.out, name) if args.out and args.impl == "all" else args.out
+        pipe = args.pipe.format(impl=name) if args.pipe else None
+        written, elapsed = export(impls.create(name), count, args.fps, args.dt,
+                                  args.substeps, out, pipe, args.workers)
+        print(f"{name:12s} {written} frames ({written / args.fps:.1f}s of video) "
+              f"to {pipe or out} in {elapsed:.2f}s, "
+              f"{written / args.fps / elapsed:.1f}x real time")
+
+
+def cmd_serve(args):
+    from .stream import serve
+
+    if args.balls:
+        from .engine import BallEngine
+
+        sim = BallEngine(args.balls, ball_radius=args.ball_radius, seed=args.seed)
+    else:
+        sim = impls.create(args.impl)
+    print(f"publishing {sim.name} on {args.address}, Ctrl-C to stop")
+    pub = serve(sim, args.address, args.dt, args.steps, args.every, args.key_every)
+    if pub.published:
+        raw = pub.balls * 4 * 8  # float64 position and velocity per ball
+        per_tick = pub.bytes / pub.published
+        print(f"{pub.published} ticks sent, {pub.keyframes} keyframes, "
+              f"{per_tick:,.0f} bytes per tick per client "
+              f"({per_tick / raw:.1%} of {raw:,} bytes raw)")
+
+
+def cmd_view(args):
+    from .stream import view
+
+    view(args.address, args.fps)
+
+
+def add_window_arguments(parser):
+    parser.add_argument("--fps", type=int, default=60,
+                        help="render frame cap in a window (0 = uncapped)")
+    parser.add_argument("--substeps", type=int, default=1,
+                        help="physics substeps per fixed dt tick in a window")
+    parser.add_argument("--full-redraw", action="store_true",
+                        help="clear and flip the whole window every frame")
+    parser.add_argument("--hud", action="store_true",
+                        help="overlay per-phase frame timings (F3 toggles)")
+    parser.add_argument("--profile-out", metavar="PATH",
+                        help="write per-frame phase timings to PATH on exit and on "
+                             "F12 (.json for JSON, CSV otherwise)")
+    parser.add_argument("--govern", action="store_true",
+                        help="lower substeps, HUD, render rate and draw detail while "
+                             "frames run over budget, and raise them again after")
+    parser.add_argument("--heatmap", metavar="PATH",
+                        help="draw where the balls have been behind the scene (H switches "
+                             "world/rotating frame) and save the counts to PATH (.npz)")
+    parser.add_argument("--threaded", action="store_true",
+                        help="step physics on its own thread at the fixed dt rate")
+    parser.add_argument("--render-delay", type=float, default=0.0, metavar="MS",
+                        help="with --threaded, sleep this long after each frame "
+                             "to simulate a slow display")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="bouncer", description=__doc__)
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run = sub.add_parser("run", help="step one implementation, or all of them")
+    run.add_argument("--impl", default="all",
+                     choices=["all", *impls.IMPLEMENTATIONS])
+    run.add_argument("--headless", action="store_true",
+                     help="no window, no display flip, no frame cap")
+    run.add_argument("--steps", type=int, default=0,
+                     help="physics steps (default: 100000 headless, "
+                          "until the window closes otherwise)")
+    run.add_argument("--dt", type=parse_dt, default=1 / 60,
+                     help="timestep in seconds, e.g. 1/60")
+    add_window_arguments(run)
+    run.set_defaults(func=cmd_run)
+
+    crowd = sub.add_parser("crowd", help="step the vectorized N-ball engine")
+    crowd.add_argument("--balls", type=int, default=100_000)
+    crowd.add_argument("--sides", type=int, default=6)
+    crowd.add_argument("--ball-radius", type=float, default=10)
+    crowd.add_argument("--ball-collisions", action="store_true",
+                       help="collide balls with each other")
+    crowd.add_argument("--cell-size", type=float,
+                       help="broad-phase cell size (default: one ball diameter)")
+    crowd.add_argument("--ccd", action="store_true",
+                       help="sweep balls against the turning walls (no tunneling)")
+    crowd.add_argument("--sleep", action="store_true",
+                       help="stop simulating balls that rest against the walls")
+    crowd.add_argument("--integrator", default="semi-implicit",
+                       choices=["euler", "semi-implicit", "verlet", "leapfrog"],
+                       help="stage order of each step (see bouncer.integrate)")
+    crowd.add_argument("--damping", type=float, default=0.0,
+                       help="air drag in 1/s, the same at any --dt")
+    crowd.add_argument("--workers", type=int, default=0,
+                       help="split the balls across this many processes over shared "
+                            "memory (wall-only physics)")
+    crowd.add_argument("--steps", type=int, default=100)
+    crowd.add_argument("--dt", type=parse_dt, default=1 / 60)
+    crowd.add_argument("--seed", type=int)
+    crowd.add_argument("--window", action="store_true",
+                       help="show the crowd instead of timing it")
+    add_window_arguments(crowd)
+    crowd.set_defaults(func=cmd_crowd)
+
+    integ = sub.add_parser("integrators", help="energy error and largest stable dt per "
+                                                "integrator")
+    integ.add_argument("--dt", type=parse_dt, default=1 / 60,
+                       help="step at which to report the energy error")
+    integ.add_argument("--tolerance", type=float, default=0.05,
+                       help="energy error allowed, as a fraction of a drop across the hexagon")
+    integ.add_argument("--seconds", type=float, default=5, help="simulated time per run")
+    integ.add_argument("--balls", type=int, default=200)
+    integ.add_argument("--ccd", action="store_true", help="swept wall contacts")
+    integ.add_argument("--seed", type=int, default=0)
+    integ.set_defaults(func=cmd_integrators)
+
+    world = sub.add_parser("world", help="step a grid of spinning containers with openings")
+    world.add_argument("--cols", type=int, default=20)
+    world.add_argument("--rows", type=int, default=15)
+    world.add_argument("--cell", type=float, default=80,
+                       help="grid pitch in pixels; containers fill 60-90%% of it")
+    world.add_argument("--balls", type=int, default=4, help="balls per container")
+    world.add_argument("--steps", type=int, default=600)
+    world.add_argument("--dt", type=parse_dt, default=1 / 60)
+    world.add_argument("--seed", type=int)
+    world.add_argument("--window", action="store_true",
+                       help="show the world instead of timing it")
+    world.add_argument("--fps", type=int, default=60)
+    world.set_defaults(func=cmd_world)
+
+    heat = sub.add_parser("heatmap", help="count where balls spend their time over a long run")
+    heat.add_argument("--impl", default="claude", choices=impls.IMPLEMENTATIONS)
+    heat.add_argument("--balls", type=int, default=0,
+                      help="use the N-ball engine with this many balls instead")
+    heat.add_argument("--ball-radius", type=float, default=10)
+    heat.add_argument("--seed", type=int)
+    heat.add_argument("--steps", type=int, default=100_000)
+    heat.add_argument("--dt", type=parse_dt, default=1 / 60)
+    heat.add_argument("--cell", type=int, default=4, help="grid cell size in pixels")
+    heat.add_argument("--out", default="heatmap.npz", help="where to save the counts")
+    heat.add_argument("--png", action="store_true",
+                      help="also write colour-mapped PNGs of both frames next to --out")
+    heat.set_defaults(func=cmd_heatmap)
+
+    out = sub.add_parser("outline", help="balls in a spinning container of any outline")
+    shape = out.add_mutually_exclusive_group()
+    shape.add_argument("--shape", default="star", choices=["star", "blob", "maze"])
+    shape.add_argument("--file", help="JSON outline to load (see bouncer.outline)")
+    out.add_argument("--save", metavar="PATH", help="write the outline as JSON")
+    out.add_argument("--balls", type=int, default=1000)
+    out.add_argument("--ball-radius", type=float, default=4)
+    out.add_argument("--omega", type=float,
+                     help="spin in radians per second (default: the scripts' 0.5 degrees a frame)")
+    out.add_argument("--steps", type=int, default=600)
+    out.add_argument("--dt", type=parse_dt, default=1 / 60)
+    out.add_argument("--seed", type=int)
+    out.add_argument("--window", action="store_true",
+                     help="show the container instead of timing it")
+    out.add_argument("--fps", type=int, default=60)
+    out.set_defaults(func=cmd_outline)
+
+    matrix = sub.add_parser("matrix", help="compare implementations over a scenario grid")
+    matrix.add_argument("--impl", default="all",
+                        choices=["all", *impls.IMPLEMENTATIONS])
+    matrix.add_argument("--steps", type=int, default=3600)
+    matrix.add_argument("--dt", type=parse_dt, default=1 / 60)
+    matrix.add_argument("--workers", type=int,
+                        help="worker processes (default: all cores)")
+    matrix.add_argument("--out", help="write every case as JSON")
+    matrix.set_defaults(func=cmd_matrix)
+
+    esc = sub.add_parser("escape", help="Monte Carlo escape rates over random launches")
+    esc.add_argument("--impl", default="all", choices=["all", *impls.IMPLEMENTATIONS])
+    esc.add_argument("--trials", type=positive_int, default=2000)
+    esc.add_argument("--steps", type=int, default=3600, help="steps per trial")
+    esc.add_argument("--dt", type=parse_dt, default=1 / 60)
+    esc.add_argument("--seed", type=int, default=0)
+    esc.add_argument("--speed", type=float, default=600,
+                     help="launch velocity drawn uniformly in ±SPEED px/s per axis "
+                          "(default: claude.py's reset)")
+    esc.add_argument("--omega", type=parse_range, metavar="LOW:HIGH",
+                     help="draw the spin uniformly in rad/s (default: the script's own)")
+    esc.add_argument("--chunk", type=int, default=50, help="trials per worker task")
+    esc.add_argument("--bins", type=int, default=4)
+    esc.add_argument("--workers", type=int, help="worker processes (default: all cores)")
+    esc.add_argument("--out", help="write the summaries as JSON")
+    esc.set_defaults(func=cmd_escape)
+
+    acc = sub.add_parser("accuracy", help="record per-step physics errors")
+    acc.add_argument("--impl", default="all", choices=["all", *impls.IMPLEMENTATIONS])
+    acc.add_argument("--steps", type=int, default=36_000)
+    acc.add_argument("--dt", type=parse_dt, default=1 / 60)
+    acc.add_argument("--save", metavar="PREFIX",
+                     help="write per-step arrays to PREFIX-<impl>.npz")
+    acc.add_argument("--overhead", action="store_true",
+                     help="also time an uninstrumented run and report the difference")
+    acc.set_defaults(func=cmd_accuracy)
+
+    rec = sub.add_parser("record", help="write a binary trajectory of one implementation")
+    rec.add_argument("--impl", required=True, choices=list(impls.IMPLEMENTATIONS))
+    rec.add_argument("--steps", type=int, default=36_000)
+    rec.add_argument("--dt", type=parse_dt, default=1 / 60)
+    rec.add_argument("--out", required=True, help="trajectory file to write")
+    rec.set_defaults(func=cmd_record)
+
+    rep = sub.add_parser("replay", help="play back or inspect a trajectory file")
+    rep.add_argument("path")
+    rep.add_argument("--start", type=int, default=0, help="first step to show")
+    rep.add_argument("--fps", type=int, default=60)
+    rep.add_argument("--info", action="store_true",
+                     help="print the header and the --start record instead")
+    rep.set_defaults(func=cmd_replay)
+
+    fork = sub.add_parser("fork", help="snapshot a run at a step and fork perturbed branches")
+    fork.add_argument("--impl", default="claude", choices=impls.IMPLEMENTATIONS)
+    start = fork.add_mutually_exclusive_group()
+    start.add_argument("--at", type=int, default=600, help="step to snapshot")
+    start.add_argument("--load", metavar="PATH", help="fork from a saved snapshot instead")
+    fork.add_argument("--save", metavar="PATH", help="write the snapshot to PATH")
+    fork.add_argument("--branches", type=int, default=1000,
+                      help="branches to run, the first unperturbed (0: snapshot only)")
+    fork.add_argument("--steps", type=int, default=600, help="steps per branch")
+    fork.add_argument("--dt", type=parse_dt, default=1 / 60)
+    fork.add_argument("--position", type=float, default=0.0,
+                      help="standard deviation of the ball position jitter, px")
+    fork.add_argument("--speed", type=float, default=0.0,
+                      help="standard deviation of the ball velocity jitter, px/s")
+    fork.add_argument("--omega", type=float, default=0.0,
+                      help="standard deviation of the spin jitter, rad/s")
+    fork.add_argument("--seed", type=int, default=0)
+    fork.add_argument("--workers", type=int, help="processes (default: CPUs)")
+    fork.set_defaults(func=cmd_fork)
+
+    exp = sub.add_parser("export", help="render frames offscreen to PNGs or an encoder pipe")
+    exp.add_argument("--impl", default="all", choices=["all", *impls.IMPLEMENTATIONS])
+    exp.add_argument("--seconds", type=float, default=10, help="length of the clip")
+    exp.add_argument("--fps", type=int, default=60, help="frames per second of video")
+    exp.add_argument("--dt", type=parse_dt, default=1 / 60)
+    exp.add_argument("--substeps", type=int, default=1)
+    target = exp.add_mutually_exclusive_group(required=True)
+    target.add_argument("--out", help="directory for numbered PNGs (one per implementation "
+                                      "with --impl all)")
+    target.add_argument("--pipe", metavar="CMD",
+                        help="shell command to feed raw 800x600 RGB24 frames on stdin; "
+                             "{impl} is replaced by the implementation name")
+    exp.add_argument("--workers", type=int, help="PNG encoder processes (default: CPUs)")
+    exp.set_defaults(func=cmd_export)
+
+    srv = sub.add_parser("serve", help="run a simulation in real time and stream its state")
+    srv.add_argument("--impl", default="claude", choices=impls.IMPLEMENTATIONS)
+    srv.add_argument("--balls", type=int, default=0,
+                     help="stream the N-ball engine with this many balls instead")
+    srv.add_argument("--ball-radius", type=float, default=10)
+    srv.add_argument("--seed", type=int)
+    srv.add_argument("--address", default="localhost:7878",
+                     help="HOST:PORT, or unix:PATH for a UNIX domain socket")
+    srv.add_argument("--dt", type=parse_dt, default=1 / 60)
+    srv.add_argument("--steps", type=int, default=0, help="stop after this many ticks")
+    srv.add_argument("--every", type=positive_int, default=1, help="publish every Nth tick")
+    srv.add_argument("--key-every", type=int, default=120,
+                     help="ticks between keyframes (0: only when a client joins)")
+    srv.set_defaults(func=cmd_serve)
+
+    view = sub.add_parser("view", help="draw a stream published by 'serve'")
+    view.add_argument("address", nargs="?", default="localhost:7878")
+    view.add_argument("--fps", type=int, default=60)
+    view.set_defaults(func=cmd_view)
+
+    bench = sub.add_parser("bench", help="benchmark the physics hot paths")
+    bench.add_argument("--filter", default="",
+                       help="only cases whose name contains this text")
+    bench.add_argument("--samples", type=int, default=50)
+    bench.add_argument("--out", help="save results as a JSON baseline")
+    bench.add_argument("--compare", metavar="BASELINE",
+                       help="fail if a case is slower than in this baseline")
+    bench.add_argument("--threshold", type=float, default=10.0,
+                       help="allowed slowdown in percent (default: 10)")
+    bench.set_defaults(func=cmd_bench)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return args.func(args)
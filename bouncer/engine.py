@@ -0,0 +1,280 @@
+"""Vectorized N-ball engine for a spinning polygon.
+
+The wall response is the one from ``check_collision`` in claude.py: push the
+ball back out along the edge normal by the penetration depth and reflect its
+velocity scaled by FRICTION. Here it is done for every ball at once on
+NumPy arrays, in the polygon's own frame, instead of a Python loop over six
+edges for a single ball. Balls inside the inscribed circle are dropped
+first; each remaining ball is tested against just the edge of the angular
+sector it lies in (see ``bouncer.geometry``).
+
+Units are pixels and seconds. The defaults are claude.py's per-frame
+constants converted at 60 FPS.
+"""
+import math
+
+import numpy as np
+
+from .ccd import edge_normal, time_of_impact
+from .geometry import RegularPolygon
+from .grid import SpatialHash, collide_balls
+from .impls.base import FPS, HEIGHT, WIDTH
+from .integrate import DEFAULT, integrate
+
+GRAVITY = 0.5 * FPS ** 2  # pixels per second²
+FRICTION = 0.8  # velocity retained on a bounce
+BALL_RADIUS = 10
+HEXAGON_RADIUS = 200
+OMEGA = math.radians(0.5) * FPS  # radians per second
+RESTITUTION = 0.9  # ball-ball bounciness
+MAX_BOUNCES = 4  # swept wall contacts resolved per ball per step
+SLEEP_SPEED = 120.0  # px/s relative to the turning container; 4 gravity kicks at 60 FPS
+SLEEP_STEPS = 30  # consecutive slow steps before a ball sleeps
+SLOP = 1.0  # px; a ball this close to a wall rests on it
+TILT = math.radians(2)  # gravity off a lone wall's normal that still holds a ball
+SETTLE_EVERY = 5  # steps between checks for slow balls
+
+
+class BallEngine:
+    name = "engine"
+
+    def __init__(self, n, center=(WIDTH / 2, HEIGHT / 2), radius=HEXAGON_RADIUS,
+                 sides=6, ball_radius=BALL_RADIUS, gravity=GRAVITY,
+                 friction=FRICTION, omega=OMEGA, ball_collisions=False,
+                 restitution=RESTITUTION, cell_size=None, ccd=False, sleep=False,
+                 sleep_speed=SLEEP_SPEED, sleep_steps=SLEEP_STEPS, integrator=DEFAULT,
+                 damping=0.0, seed=None):
+        self.center = np.array(center, dtype=float)
+        self.radius = radius
+        self.sides = sides
+        self.polygon = RegularPolygon(sides, radius)
+        self.ball_radius = ball_radius
+        self.gravity = gravity
+        self.friction = friction
+        self.omega = omega
+        self.angle = 0.0
+        self.contacts = 0  # wall contacts since the start, as Simulation counts them
+        self.restitution = restitution
+        # Stage order of the step (see bouncer.integrate) and air drag in 1/s
+        self.integrator = integrator
+        self.damping = damping
+        # Sweep balls against the turning walls instead of testing overlap
+        # only at the end of the step
+        self.ccd = ccd
+        # Broad phase for ball-ball contacts; None keeps balls independent
+        self.grid = (SpatialHash.for_container(center, radius, ball_radius, cell_size)
+                     if ball_collisions else None)
+        self.pos = np.zeros((n, 2))
+        self.vel = np.zeros((n, 2))
+        # Resting balls sleep: they ride along with the container, fixed in
+        # its frame, until it turns far enough to tip them out of their
+        # corner (wake_at) or a neighbour knocks them
+        self.sleep = sleep
+        self.sleep_speed = sleep_speed
+        self.sleep_steps = sleep_steps
+        self.asleep = np.zeros(n, dtype=bool)
+        self._still = np.zeros(n, dtype=np.int32)
+        self._local = np.zeros((n, 2))
+        self._wake_at = np.zeros(n)
+        self._awake = None  # indices of awake balls, None when all are
+        self._steps = 0
+        self.spawn(np.random.default_rng(seed))
+
+    def __len__(self):
+        return len(self.pos)
+
+    def spawn(self, rng, speed=10 * FPS):
+        """Scatter balls inside the inscribed circle with random velocities."""
+        n = len(self.pos)
+        r = (self.polygon.apothem - self.ball_radius) * np.sqrt(rng.uniform(0, 1, n))
+        theta = rng.uniform(0, 2 * math.pi, n)
+        self.pos[:, 0] = self.center[0] + r * np.cos(theta)
+        self.pos[:, 1] = self.center[1] + r * np.sin(theta)
+        self.vel[:] = rng.uniform(-speed, speed, (n, 2))
+        self.wake(np.flatnonzero(self.asleep))
+
+    def reset(self):
+        """Respawn every ball, as a click does in claude.py."""
+        self.spawn(np.random.default_rng())
+
+    @property
+    def hex_radius(self):
+        """Container radius, under the name Simulation uses."""
+        return self.radius
+
+    def render_state(self):
+        return self.angle, self.pos.copy()
+
+    def vertices(self, angle=None):
+        """Polygon vertices in world coordinates, shape (S, 2)."""
+        return self.polygon.vertices(self.center, self.angle if angle is None else angle)
+
+    def step(self, dt):
+        start = self.angle
+        self.angle += self.omega * dt
+        awake = self._awake
+        pos, vel = (self.pos, self.vel) if awake is None else (self.pos[awake], self.vel[awake])
+        if self.ccd:
+            integrate(self.integrator, pos, vel, self.gravity, self.damping, dt,
+                      lambda p, v, t, h: self.sweep(p, v, start + self.omega * t, h))
+        else:
+            integrate(self.integrator, pos, vel, self.gravity, self.damping, dt)
+        if awake is not None:
+            self.pos[awake], self.vel[awake] = pos, vel
+            self._carry()
+        if self.grid is not None:
+            collide_balls(self.pos, self.vel, self.ball_radius, self.restitution, self.grid)
+            if awake is not None:
+                self._disturbed()
+                awake = self._awake
+                pos, vel = (self.pos, self.vel) if awake is None else (self.pos[awake], self.vel[awake])
+        self.contacts += self.polygon.collide(pos, vel, self.center, self.angle, self.omega,
+                                              self.ball_radius, self.friction)
+        if awake is not None:
+            self.pos[awake], self.vel[awake] = pos, vel
+        if self.sleep:
+            self._settle()
+
+    def collide(self):
+        """Resolve the deepest wall contact of every ball."""
+        self.contacts += self.polygon.collide(self.pos, self.vel, self.center, self.angle,
+                                              self.omega, self.ball_radius, self.friction)
+
+    def sweep(self, pos, vel, start, dt):
+        """Move balls through dt, bouncing at each swept wall contact.
+
+        A ball still bouncing after MAX_BOUNCES contacts (wedged in a corner)
+        gives up the rest of the step where it stands rather than being
+        moved through a wall.
+        """
+        inset = self.polygon.apothem - self.ball_radius
+        left = np.full(len(pos), float(dt))
+        active = np.arange(len(pos))
+        for _ in range(MAX_BOUNCES):
+            phase = start + self.omega * (dt - left[active])
+            toi, edge = time_of_impact(pos[active], vel[active], self.center,
+                                       phase, self.omega, self.sides, inset, left[active])
+            pos[active] += vel[active] * toi[:, None]
+            hit = toi < left[active]
+            left[active] -= toi
+            active, edge, phase = active[hit], edge[hit], phase[hit] + self.omega * toi[hit]
+            if not len(active):
+                return
+            self.contacts += len(active)
+            outward = edge_normal(phase, edge, self.sides)
+            self.bounce(vel, active, -outward, pos[active] + outward * self.ball_radius)
+
+    def _settle(self):
+        """Wake tipped sleepers; every SETTLE_EVERY steps, sleep resting balls."""
+        if self.omega and self.asleep.any():
+            sleepers = np.flatnonzero(self.asleep)
+            tipped = np.sign(self.omega) * (self.angle - self._wake_at[sleepers]) >= 0
+            self.wake(sleepers[tipped])
+        self._steps += 1
+        if self._steps % SETTLE_EVERY:
+            return
+
+        awake = self._awake
+        if awake is None:
+            pos, vel, still = self.pos, self.vel, self._still
+        else:
+            pos, vel, still = self.pos[awake], self.vel[awake], self._still[awake]
+        rx, ry = pos[:, 0] - self.center[0], pos[:, 1] - self.center[1]
+        relx, rely = vel[:, 0] + self.omega * ry, vel[:, 1] - self.omega * rx
+        still = (still + 1) * (relx * relx + rely * rely < self.sleep_speed ** 2)
+        if awake is None:
+            self._still[:] = still
+            ready = np.flatnonzero(still * SETTLE_EVERY >= self.sleep_steps)
+        else:
+            self._still[awake] = still
+            ready = awake[still * SETTLE_EVERY >= self.sleep_steps]
+        if len(ready):
+            self._fall_asleep(ready)
+
+    def _fall_asleep(self, idx):
+        """Sleep the balls of idx that rest on a wall with gravity holding them there.
+
+        Support comes from the walls within SLOP. In a corner gravity must
+        point between the two wall normals, against a lone wall within TILT
+        of its normal; otherwise the ball slides. As the container turns,
+        gravity sweeps across that cone in the container's frame, so the
+        angle at which it leaves is known now and stored as the wake-up
+        angle. (The centrifugal pull, under 5% of gravity at the scripts'
+        spin, is ignored.)
+        """
+        sides, step = self.sides, 2 * math.pi / self.sides
+        c, s = math.cos(self.angle), math.sin(self.angle)
+        d = self.pos[idx] - self.center
+        q = np.column_stack((c * d[:, 0] + s * d[:, 1], c * d[:, 1] - s * d[:, 0]))
+        reach = q @ self.polygon.normals.T - (self.polygon.apothem - self.ball_radius)
+        rows = np.arange(len(idx))
+        edge = reach.argmax(axis=1)
+        prev, nxt = (edge - 1) % sides, (edge + 1) % sides
+        first = np.where(reach[rows, prev] > reach[rows, nxt], prev, edge)
+        corner = np.maximum(reach[rows, prev], reach[rows, nxt]) >= -SLOP
+        touching = reach[rows, edge] >= -SLOP
+
+        # Cone of support as [lo, lo + width] in the container frame, where
+        # normal k points at angle k * step + step / 2
+        lo = np.where(corner, first * step + step / 2, edge * step + step / 2 - TILT)
+        width = np.where(corner, step, 2 * TILT)
+        gravity = math.pi / 2 - self.angle  # world "down" seen from the container
+        into = np.mod(gravity - lo, 2 * math.pi)
+        held = touching & (into <= width)
+        # Sliding balls count their slow steps from zero again rather than
+        # being re-tested every SETTLE_EVERY steps
+        self._still[idx[~held]] = 0
+        if not held.any():
+            return
+
+        idx, q, reach = idx[held], q[held], np.maximum(reach[held], 0.0)
+        # Gravity turns against the spin in the container frame
+        turn = into[held] if self.omega >= 0 else width[held] - into[held]
+        self._wake_at[idx] = self.angle + np.copysign(turn, self.omega or 1.0)
+        self._local[idx] = q - reach @ self.polygon.normals
+        self.asleep[idx] = True
+        self._awake = np.flatnonzero(~self.asleep)
+        self._carry()
+
+    def _carry(self):
+        """Move sleeping balls along with the container."""
+        sleepers = np.flatnonzero(self.asleep)
+        c, s = math.cos(self.angle), math.sin(self.angle)
+        qx, qy = self._local[sleepers, 0], self._local[sleepers, 1]
+        rx, ry = c * qx - s * qy, s * qx + c * qy
+        self.pos[sleepers, 0] = self.center[0] + rx
+        self.pos[sleepers, 1] = self.center[1] + ry
+        self.vel[sleepers, 0] = -self.omega * ry
+        self.vel[sleepers, 1] = self.omega * rx
+
+    def _disturbed(self):
+        """Wake sleepers that ball collisions knocked; hold the rest in place."""
+        sleepers = np.flatnonzero(self.asleep)
+        pos, vel = self.pos[sleepers], self.vel[sleepers]
+        self._carry()
+        dp = pos - self.pos[sleepers]
+        dv = vel - self.vel[sleepers]
+        knocked = ((np.einsum("ij,ij->i", dv, dv) > self.sleep_speed ** 2)
+                   | (np.einsum("ij,ij->i", dp, dp) > SLOP ** 2))
+        if knocked.any():
+            idx = sleepers[knocked]
+            self.pos[idx], self.vel[idx] = pos[knocked], vel[knocked]
+            self.wake(idx)
+
+    def wake(self, idx):
+        if not len(idx):
+            return
+        self.asleep[idx] = False
+        self._still[idx] = 0
+        self._awake = np.flatnonzero(~self.asleep) if self.asleep.any() else None
+
+    def bounce(self, vel, hit, n, contact):
+        """Reflect balls ``hit`` of vel off walls with inward normals n at contact."""
+        # Reflect relative to the wall point's velocity, omega x r
+        rc = contact - self.center
+        wall = self.omega * np.column_stack((-rc[:, 1], rc[:, 0]))
+        rel = vel[hit] - wall
+        vn = np.einsum("ij,ij->i", rel, n)
+        approaching = vn < 0
+        rel[approaching] = (rel[approaching] - 2 * vn[approaching, None] * n[approaching]) * self.friction
+        vel[hit] = rel + wall
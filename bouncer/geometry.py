@@ -0,0 +1,144 @@
+"""Collision kernel for a spinning regular polygon, in the polygon's frame.
+
+The scripts rebuild every vertex with ``math.cos``/``math.sin`` each step
+(gemini-2.0.py twice per edge) and then re-derive each edge normal with a
+square root. The polygon never changes shape, though, only its angle. So
+the outward edge normals and the apothem are stored once in the polygon's
+own frame, and each step rotates the ball into that frame with a single
+sin/cos pair. A ball of radius r is then clear of edge k exactly when
+``n_k . q <= apothem - r``, a plain dot product against a constant
+half-plane. The response is worked out in that frame and rotated back.
+
+Only one edge is ever tested per ball. A centre with ``|q| <= apothem - r``
+clears every edge (the inscribed-circle test), and most balls take that
+exit. Otherwise the deepest edge, the one whose normal is closest in
+direction to q, is the edge of the angular sector q lies in:
+``floor(atan2(q_y, q_x) / step)``. The cost of a collision is then the same
+for a 1024-gon standing in for a circle as for the hexagon.
+
+Angular velocity looks the same in both frames, so the wall velocity at a
+local point q is simply ``omega * (-q_y, q_x)``.
+"""
+import math
+
+import numpy as np
+
+
+class RegularPolygon:
+    def __init__(self, sides: int, radius: float):
+        if sides < 3:
+            raise ValueError(f"a polygon needs at least 3 sides, got {sides}")
+        self.sides = sides
+        self.radius = radius
+        self.apothem = radius * math.cos(math.pi / sides)
+        self.step = step = 2 * math.pi / sides
+        theta = np.arange(sides) * step
+        # Vertex i sits at angle i * step; edge i runs to vertex i + 1 and
+        # faces outward at the angle halfway between them
+        self.local_vertices = radius * np.column_stack((np.cos(theta), np.sin(theta)))
+        self.normals = np.column_stack((np.cos(theta + step / 2), np.sin(theta + step / 2)))
+        self._normals = [tuple(n) for n in self.normals.tolist()]
+
+    def half_edge(self, inset):
+        """Half the length of an edge of the polygon shrunk to apothem ``inset``."""
+        return max(inset, 0.0) * math.tan(self.step / 2)
+
+    def sector(self, qx, qy):
+        """Index of the edge facing local point(s) q, the one deepest into."""
+        return np.floor_divide(np.arctan2(qy, qx), self.step).astype(np.intp) % self.sides
+
+    def vertices(self, center, angle):
+        """Vertices in world coordinates at rotation ``angle``, shape (S, 2)."""
+        c, s = math.cos(angle), math.sin(angle)
+        x, y = self.local_vertices.T
+        return np.column_stack((center[0] + c * x - s * y, center[1] + s * x + c * y))
+
+    def collide(self, pos, vel, center, angle, omega, ball_radius, friction):
+        """Resolve the deepest wall contact of each ball in place.
+
+        ``pos`` and ``vel`` are (N, 2) world arrays. A ball moving into the
+        wall, relative to the wall's own velocity, is reflected and scaled by
+        friction. Returns the number of balls in contact.
+        """
+        inset = self.apothem - ball_radius
+        c, s = math.cos(angle), math.sin(angle)
+        dx, dy = pos[:, 0] - center[0], pos[:, 1] - center[1]
+        qx, qy = c * dx + s * dy, c * dy - s * dx
+
+        near = np.flatnonzero(qx * qx + qy * qy > inset * inset) if inset > 0 else np.arange(len(qx))
+        qx, qy = qx[near], qy[near]
+        edge = self.sector(qx, qy)
+        nx, ny = self.normals[edge, 0], self.normals[edge, 1]
+        depth = qx * nx + qy * ny - inset
+        inside = depth > 0
+        hit = near[inside]
+        if not len(hit):
+            return 0
+
+        nx, ny, depth = nx[inside], ny[inside], depth[inside]
+        qx, qy = qx[inside] - nx * depth, qy[inside] - ny * depth
+
+        # A ball far outside can land on the edge's line but beyond its end;
+        # it slides back along the line to the corner. (A push along the
+        # neighbour's normal only works with adjacent normals under 90° apart,
+        # so not for a triangle.)
+        along = ny * qx - nx * qy
+        slide = np.clip(along, -self.half_edge(inset), self.half_edge(inset)) - along
+        qx += ny * slide
+        qy -= nx * slide
+
+        vx, vy = vel[hit, 0], vel[hit, 1]
+        ux, uy = c * vx + s * vy, c * vy - s * vx
+
+        # Relative to the wall point under the ball
+        wx, wy = -omega * (qy + ny * ball_radius), omega * (qx + nx * ball_radius)
+        rx, ry = ux - wx, uy - wy
+        vn = rx * nx + ry * ny
+        into = vn > 0
+        scale = np.where(into, friction, 1.0)
+        rx = (rx - np.where(into, 2 * vn, 0.0) * nx) * scale
+        ry = (ry - np.where(into, 2 * vn, 0.0) * ny) * scale
+        ux, uy = rx + wx, ry + wy
+
+        pos[hit, 0] = center[0] + c * qx - s * qy
+        pos[hit, 1] = center[1] + s * qx + c * qy
+        vel[hit, 0] = c * ux - s * uy
+        vel[hit, 1] = s * ux + c * uy
+        return len(hit)
+
+    def collide_one(self, x, y, vx, vy, center, angle, omega, ball_radius, friction):
+        """Scalar version of ``collide`` for a single ball.
+
+        Returns ``(x, y, vx, vy, hit)``.
+        """
+        c, s = math.cos(angle), math.sin(angle)
+        dx, dy = x - center[0], y - center[1]
+        qx, qy = c * dx + s * dy, c * dy - s * dx
+        inset = self.apothem - ball_radius
+        if qx * qx + qy * qy <= inset * inset and inset > 0:
+            return x, y, vx, vy, False
+
+        step, normals = self.step, self._normals
+        nx, ny = normals[int(math.atan2(qy, qx) // step) % self.sides]
+        depth = qx * nx + qy * ny - inset
+        if depth <= 0:
+            return x, y, vx, vy, False
+
+        qx -= nx * depth
+        qy -= ny * depth
+        along, half = ny * qx - nx * qy, self.half_edge(inset)
+        if abs(along) > half:
+            slide = math.copysign(half, along) - along
+            qx += ny * slide
+            qy -= nx * slide
+
+        ux, uy = c * vx + s * vy, c * vy - s * vx
+        wx, wy = -omega * (qy + ny * ball_radius), omega * (qx + nx * ball_radius)
+        rx, ry = ux - wx, uy - wy
+        vn = rx * nx + ry * ny
+        if vn > 0:
+            rx = (rx - 2 * vn * nx) * friction
+            ry = (ry - 2 * vn * ny) * friction
+        ux, uy = rx + wx, ry + wy
+        return (center[0] + c * qx - s * qy, center[1] + s * qx + c * qy,
+                c * ux - s * uy, s * ux + c * uy, True)
@@ -0,0 +1,109 @@
+"""Adaptive quality governor for the windowed loop.
+
+Every frame of ``run_window`` does full-quality work whatever it costs, so
+with many balls, or several windows on one machine, the frame rate
+collapses. ``QualityGovernor`` is fed the busy time of each frame (all of
+it but the wait in ``clock.tick``) and keeps a running average of it as a
+fraction of the frame budget. Above OVER it lowers quality one level,
+below UNDER it raises it again, and every change is logged.
+
+The levels, from full quality down (see ``ladder``):
+
+1. halve the physics substeps, never below the number that keeps a substep
+   within MAX_SUBSTEP;
+2. drop decoration (the profiler HUD);
+3. render every 2nd, then every 4th frame; the fixed-step loop still runs
+   every physics tick, so the simulation is unchanged;
+4. coarse drawing (``Renderer.coarse``).
+
+Each time a raise ends in an overrun, the governor waits twice as long
+(up to MAX_PATIENCE frames) before trying that raise again, so a load that
+sits between two levels settles on the lower one instead of flapping.
+"""
+import math
+from collections import namedtuple
+
+from .impls.base import FPS
+
+OVER = 0.9  # busy fraction of the frame budget that lowers quality
+UNDER = 0.5  # busy fraction that raises it
+SMOOTHING = 0.1  # weight of the newest frame in the running average
+HOLD = 30  # frames after a change before the next one
+MAX_PATIENCE = 64 * HOLD  # longest wait before retrying a raise that failed
+MAX_SUBSTEP = 1 / FPS  # longest substep allowed; one frame of the scripts
+RENDER_DIVISORS = (2, 4)
+
+Quality = namedtuple("Quality", "substeps decor divisor coarse")
+
+
+def ladder(dt, substeps=1, decor=False, divisors=RENDER_DIVISORS):
+    """Quality levels for a loop of dt ticks in ``substeps``, best first."""
+    floor = min(substeps, max(1, math.ceil(dt / MAX_SUBSTEP - 1e-9)))
+    levels = [Quality(substeps, decor, 1, False)]
+    n = substeps
+    while n > floor:
+        n = max(floor, n // 2)
+        levels.append(levels[-1]._replace(substeps=n))
+    if decor:
+        levels.append(levels[-1]._replace(decor=False))
+    for divisor in divisors:
+        levels.append(levels[-1]._replace(divisor=divisor))
+    levels.append(levels[-1]._replace(coarse=True))
+    return levels
+
+
+def describe(quality, fps):
+    return (f"substeps {quality.substeps}, decor {'on' if quality.decor else 'off'}, "
+            f"render {fps / quality.divisor:g} fps, "
+            f"{'coarse' if quality.coarse else 'full'} detail")
+
+
+class QualityGovernor:
+    """Pick a quality level from measured frame busy times."""
+
+    def __init__(self, fps=FPS, dt=1 / FPS, substeps=1, decor=False, log=print):
+        self.fps = fps or FPS
+        self.budget = 1 / self.fps
+        self.levels = ladder(dt, substeps, decor)
+        self.level = 0
+        self.load = 0.0
+        self.frames = 0
+        self.changes = []  # (frame, old level, new level, load)
+        self.log = log
+        self._since = 0  # frames since the last change
+        self._patience = [HOLD] * len(self.levels)  # frames to spend at a level before raising
+        self._raised = False  # whether the current level was reached by a raise
+
+    @property
+    def quality(self):
+        return self.levels[self.level]
+
+    def update(self, busy):
+        """Record one frame's busy seconds; return the new Quality if it changed."""
+        quality = self.quality
+        self.load += SMOOTHING * (busy / (self.budget * quality.divisor) - self.load)
+        self.frames += 1
+        self._since += 1
+        if self._since < HOLD:
+            return None
+        if self.load > OVER and self.level < len(self.levels) - 1:
+            if self._raised:
+                # The raise did not hold: wait longer before trying it again
+                below = self.level + 1
+                self._patience[below] = min(2 * self._patience[below], MAX_PATIENCE)
+            self._raised = False
+            return self._change(self.level + 1, "over budget")
+        if (self.load < UNDER and self.level > 0
+                and self._since >= self._patience[self.level]):
+            self._raised = True
+            return self._change(self.level - 1, "headroom")
+        return None
+
+    def _change(self, level, reason):
+        old, self.level = self.level, level
+        self.changes.append((self.frames, old, level, self.load))
+        self._since = 0
+        if self.log:
+            self.log(f"quality {old} -> {level} at frame {self.frames} ({reason}, "
+                     f"load {self.load:.2f}): {describe(self.quality, self.fps)}")
+        return self.quality
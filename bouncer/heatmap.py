@@ -0,0 +1,129 @@
+"""Where the balls spend their time: occupancy heatmaps over long runs.
+
+``Heatmap`` counts ball positions per cell of two preallocated grids of
+CELL-pixel cells covering the screen: one in the world frame, one in the
+container's rotating frame (turned back to angle 0 about the container
+centre, so a ball resting in a corner keeps hitting the same cells). Each
+count is one ball for one sample, so a grid is time spent, not visits.
+
+Samples are binned with NumPy index arithmetic: the cell index of every
+point is computed at once and ``np.bincount`` adds them to the flat grid.
+A single-ball script gives one point a tick, which is not worth a NumPy
+call, so points are queued in a fixed buffer of BATCH rows and binned when
+it fills. Large arrays, as from ``bouncer.engine``, go straight to the
+grids. Memory is the two grids and the buffer however long the run.
+
+For display the grid is log-scaled, mapped through a 256-colour table and
+written into a grid-sized surface with ``pygame.surfarray.blit_array``,
+then scaled to the screen. That is redone every REFRESH frames, not every
+physics tick; ``run_window`` draws the result behind the container and the
+balls. ``save`` writes the raw counts to an ``.npz`` for offline analysis.
+"""
+import math
+
+import numpy as np
+
+from .impls.base import HEIGHT, WIDTH
+
+CELL = 4  # pixels per grid cell, in both directions
+BATCH = 4096  # queued samples before they are binned
+REFRESH = 15  # frames between redraws of the heatmap layer
+FRAMES = ("world", "local")
+
+# Colour table stops: black through blue, red and yellow to white
+STOPS = np.array([[0, 0, 0], [40, 0, 120], [200, 30, 40], [255, 200, 0], [255, 255, 255]])
+
+
+def palette(stops=STOPS, size=256):
+    """(size, 3) uint8 colour table interpolated between stops."""
+    x = np.linspace(0, 1, len(stops))
+    t = np.linspace(0, 1, size)
+    return np.column_stack([np.interp(t, x, stops[:, i]) for i in range(3)]).astype(np.uint8)
+
+
+class Heatmap:
+    """Occupancy counts in the world frame and the rotating frame."""
+
+    def __init__(self, center, size=(WIDTH, HEIGHT), cell=CELL, batch=BATCH):
+        self.center = np.array(center, dtype=float)
+        self.size = size
+        self.cell = cell
+        self.cols, self.rows = math.ceil(size[0] / cell), math.ceil(size[1] / cell)
+        self.grids = {frame: np.zeros(self.rows * self.cols, dtype=np.int64)
+                      for frame in FRAMES}
+        self.samples = 0  # ball positions binned, or queued to be
+        self.view = "world"
+        self._queue = np.empty((batch, 3))  # angle, x, y
+        self._queued = 0
+        self._palette = palette()
+        self._small = self._scaled = None
+
+    def add(self, angle, positions):
+        """Count positions, seen with the container at angle."""
+        pos = np.asarray(positions, dtype=float).reshape(-1, 2)
+        n = len(pos)
+        self.samples += n
+        if n >= len(self._queue) // 4:
+            self._bin(angle, pos)
+            return
+        if self._queued + n > len(self._queue):
+            self.flush()
+        rows = self._queue[self._queued:self._queued + n]
+        rows[:, 0] = angle
+        rows[:, 1:] = pos
+        self._queued += n
+
+    def flush(self):
+        """Bin whatever is queued."""
+        if self._queued:
+            rows = self._queue[:self._queued]
+            self._bin(rows[:, 0], rows[:, 1:])
+            self._queued = 0
+
+    def _bin(self, angle, pos):
+        # Rotating frame: undo the turn about the centre, keep the screen position
+        c, s = np.cos(angle), np.sin(angle)
+        dx, dy = pos[:, 0] - self.center[0], pos[:, 1] - self.center[1]
+        local = np.column_stack((self.center[0] + c * dx + s * dy,
+                                 self.center[1] + c * dy - s * dx))
+        for frame, points in (("world", pos), ("local", local)):
+            ix = np.floor(points[:, 0] / self.cell).astype(np.intp)
+            iy = np.floor(points[:, 1] / self.cell).astype(np.intp)
+            inside = (ix >= 0) & (ix < self.cols) & (iy >= 0) & (iy < self.rows)
+            grid = self.grids[frame]
+            grid += np.bincount(iy[inside] * self.cols + ix[inside], minlength=grid.size)
+
+    def counts(self, frame="world"):
+        """(rows, cols) counts of frame, queued samples included."""
+        self.flush()
+        return self.grids[frame].reshape(self.rows, self.cols)
+
+    def colors(self, frame="world"):
+        """(rows, cols, 3) uint8 colour-mapped view of frame, log-scaled."""
+        counts = self.counts(frame)
+        top = counts.max()
+        if not top:
+            return np.zeros((self.rows, self.cols, 3), dtype=np.uint8)
+        level = np.log1p(counts) * ((len(self._palette) - 1) / math.log1p(top))
+        return self._palette[level.astype(np.intp)]
+
+    def surface(self, frame=None):
+        """The colour-mapped view scaled to ``size``, as a reused pygame Surface."""
+        import pygame
+
+        if self._small is None:
+            self._small = pygame.Surface((self.cols, self.rows))
+            self._scaled = pygame.Surface(self.size)
+        pygame.surfarray.blit_array(self._small, self.colors(frame or self.view).swapaxes(0, 1))
+        pygame.transform.scale(self._small, self.size, self._scaled)
+        return self._scaled
+
+    def toggle(self):
+        """Switch the displayed frame between world and rotating."""
+        self.view = FRAMES[1 - FRAMES.index(self.view)]
+
+    def save(self, path):
+        """Write both grids and their geometry to an .npz file."""
+        self.flush()
+        np.savez_compressed(path, world=self.counts("world"), local=self.counts("local"),
+                            cell=self.cell, center=self.center, samples=self.samples)
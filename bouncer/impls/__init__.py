@@ -0,0 +1,32 @@
+"""Registry of the headless implementation ports.
+
+Names match the script file names in the repository root, so
+``deepseek-r1`` refers to ``deepseek-r1.py``.
+"""
+import importlib
+
+IMPLEMENTATIONS = {
+    "4o": "gpt4o",
+    "claude": "claude",
+    "deepseek-r1": "deepseek_r1",
+    "gemini-2.0": "gemini_2_0",
+    "llama": "llama",
+    "o3-mini": "o3_mini",
+    "perplexity": "perplexity",
+}
+
+
+def load(name):
+    """Return the Simulation class for an implementation name."""
+    try:
+        module = IMPLEMENTATIONS[name]
+    except KeyError:
+        raise ValueError(
+            f"unknown implementation {name!r}; "
+            f"choose from {', '.join(IMPLEMENTATIONS)}") from None
+    return importlib.import_module(f"{__name__}.{module}").Simulation
+
+
+def create(name, **params):
+    """Instantiate an implementation, dropping parameters left as None."""
+    return load(name)(**{k: v for k, v in params.items() if v is not None})
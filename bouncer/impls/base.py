@@ -0,0 +1,105 @@
+import math
+import operator
+import random
+
+WIDTH, HEIGHT = 800, 600
+FPS = 60
+
+
+class Simulation:
+    """Physics of one implementation, stepped without a window.
+
+    Each subclass keeps its state in the units its script uses. The methods
+    below expose that state in common units (pixels, pixels per second,
+    radians) so the tooling can compare implementations with each other.
+    """
+
+    name = ""
+    sides = 6
+    # Frame-based scripts advance one frame per loop iteration; their
+    # constants are per frame at FPS. The others take dt in seconds.
+    frame_based = True
+    # Attribute holding the container angle, and radians per unit of it
+    angle_attr = "angle"
+    angle_unit = math.pi / 180
+    # Attribute holding the ball's x, y, vx and vy, when they are only
+    # forwarded by properties here; sampling it directly is cheaper
+    ball_attr = ""
+    # Running count of wall (and screen edge) bounces
+    contacts = 0
+
+    def step(self, dt: float):
+        raise NotImplementedError
+
+    def frames(self, dt: float) -> float:
+        """Number of 60 FPS frames covered by dt."""
+        return dt * FPS
+
+    def position(self):
+        return self.x, self.y
+
+    def velocity(self):
+        """Ball velocity in pixels per second."""
+        if self.frame_based:
+            return self.vx * FPS, self.vy * FPS
+        return self.vx, self.vy
+
+    def set_ball(self, x: float, y: float, vx: float, vy: float):
+        """Place the ball; velocity is given in pixels per second."""
+        self.x, self.y = x, y
+        if self.frame_based:
+            vx, vy = vx / FPS, vy / FPS
+        self.vx, self.vy = vx, vy
+
+    def reset(self):
+        """Click-to-reset from claude.py: ball to the centre, random velocity."""
+        cx, cy = self.center
+        self.set_ball(cx, cy, random.uniform(-10, 10) * FPS, random.uniform(-10, 10) * FPS)
+
+    def sampler(self):
+        """Cheap getter of the raw state as a tuple, for per-step recording.
+
+        The tuple is (x, y, vx, vy, angle, contacts) in the script's own
+        units; ``convert`` turns a batch of them into common units.
+        """
+        prefix = f"{self.ball_attr}." if self.ball_attr else ""
+        return operator.attrgetter(*(prefix + field for field in ("x", "y", "vx", "vy")),
+                                   self.angle_attr, "contacts")
+
+    def convert(self, raw):
+        """Split an (n, 6) NumPy array of samples into common-unit columns.
+
+        Returns x, y, vx, vy (pixels per second), angle (radians) and the
+        running contact count.
+        """
+        x, y, vx, vy, angle, contacts = raw.T
+        if self.frame_based:
+            vx, vy = vx * FPS, vy * FPS
+        return x, y, vx, vy, angle * self.angle_unit, contacts
+
+    def rotation(self) -> float:
+        """Container rotation in radians."""
+        raise NotImplementedError
+
+    def angular_velocity(self) -> float:
+        """Container spin in radians per second."""
+        raise NotImplementedError
+
+    def gravity(self) -> float:
+        """Downward acceleration in pixels per second squared."""
+        raise NotImplementedError
+
+    def render_state(self):
+        """Container angle and ball positions, for interpolated drawing."""
+        return self.rotation(), [self.position()]
+
+    def vertices(self, angle=None):
+        """Container vertices in world coordinates, at ``angle`` if given."""
+        cx, cy = self.center
+        if angle is None:
+            angle = self.rotation()
+        return [
+            (cx + self.hex_radius * math.cos(angle + 2 * math.pi * i / self.sides),
+             cy + self.hex_radius * math.sin(angle + 2 * math.pi * i / self.sides))
+            for i in range(self.sides)
+        ]
@@ -0,0 +1,124 @@
+"""Headless port of claude.py."""
+import math
+
+import numpy as np
+
+from . import base
+from .base import FPS, HEIGHT, WIDTH
+
+GRAVITY = 0.5
+FRICTION = 0.8
+BALL_RADIUS = 10
+HEXAGON_RADIUS = 200
+ROTATION_SPEED = 0.5  # degrees per frame
+
+
+class Ball:
+    def __init__(self, x, y):
+        self.pos = np.array([float(x), float(y)])
+        self.vel = np.array([0.0, 0.0])
+
+    def update(self, gravity=GRAVITY, k=1.0):
+        self.vel[1] += gravity * k
+        self.pos += self.vel * k
+
+
+class Hexagon:
+    def __init__(self, center_x, center_y, radius):
+        self.center = np.array([center_x, center_y])
+        self.radius = radius
+        self.angle = 0
+
+    def get_vertices(self):
+        vertices = []
+        for i in range(6):
+            angle = math.radians(self.angle + i * 60)
+            x = self.center[0] + self.radius * math.cos(angle)
+            y = self.center[1] + self.radius * math.sin(angle)
+            vertices.append(np.array([x, y]))
+        return vertices
+
+    def rotate(self, speed=ROTATION_SPEED):
+        self.angle += speed
+
+
+def get_line_normal(p1, p2):
+    dx = p2[0] - p1[0]
+    dy = p2[1] - p1[1]
+    length = math.sqrt(dx*dx + dy*dy)
+    return np.array([-dy/length, dx/length])
+
+
+def check_collision(ball, vertices, radius=BALL_RADIUS, friction=FRICTION):
+    hits = 0
+    for i in range(len(vertices)):
+        p1 = vertices[i]
+        p2 = vertices[(i + 1) % len(vertices)]
+
+        normal = get_line_normal(p1, p2)
+
+        line_vec = p2 - p1
+        ball_vec = ball.pos - p1
+        projection = np.dot(ball_vec, line_vec) / np.dot(line_vec, line_vec)
+        closest_point = p1 + projection * line_vec
+
+        if (0 <= projection <= 1 and
+                np.linalg.norm(closest_point - ball.pos) < radius):
+            ball.pos = closest_point + normal * radius
+            reflection = ball.vel - 2 * np.dot(ball.vel, normal) * normal
+            ball.vel = reflection * friction
+            hits += 1
+    return hits
+
+
+class Simulation(base.Simulation):
+    name = "claude"
+    angle_attr = "hexagon.angle"
+
+    def __init__(self, hex_radius=HEXAGON_RADIUS, ball_radius=BALL_RADIUS,
+                 gravity=None, friction=FRICTION, omega=None):
+        self.center = (WIDTH / 2, HEIGHT / 2)
+        self.hex_radius = hex_radius
+        self.ball_radius = ball_radius
+        self.g = GRAVITY if gravity is None else gravity / FPS ** 2
+        self.friction = friction
+        self.rotation_speed = (ROTATION_SPEED if omega is None
+                               else math.degrees(omega) / FPS)
+        self.ball = Ball(WIDTH / 2, HEIGHT / 2)
+        self.hexagon = Hexagon(WIDTH / 2, HEIGHT / 2, hex_radius)
+
+    @property
+    def x(self):
+        return self.ball.pos[0]
+
+    @property
+    def y(self):
+        return self.ball.pos[1]
+
+    @property
+    def vx(self):
+        return self.ball.vel[0]
+
+    @property
+    def vy(self):
+        return self.ball.vel[1]
+
+    def set_ball(self, x, y, vx, vy):
+        self.ball.pos = np.array([float(x), float(y)])
+        self.ball.vel = np.array([vx / FPS, vy / FPS])
+
+    def rotation(self):
+        return math.radians(self.hexagon.angle)
+
+    def angular_velocity(self):
+        return math.radians(self.rotation_speed) * FPS
+
+    def gravity(self):
+        return self.g * FPS ** 2
+
+    def step(self, dt):
+        k = self.frames(dt)
+        self.hexagon.rotate(self.rotation_speed * k)
+        self.ball.update(self.g, k)
+        self.contacts += check_collision(self.ball, self.hexagon.get_vertices(),
+                                         self.ball_radius, self.friction)
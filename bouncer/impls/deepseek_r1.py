@@ -0,0 +1,124 @@
+"""Headless port of deepseek-r1.py."""
+import math
+
+from . import base
+from .base import HEIGHT, WIDTH
+
+CENTER = (WIDTH // 2, HEIGHT // 2)
+HEX_RADIUS = 200
+BALL_RADIUS = 10
+OMEGA = 3  # Angular velocity in radians per second
+GRAVITY = 0.8  # Pixels per second squared
+FRICTION = 0.995  # Velocity retention factor per frame
+COR = 0.8  # Coefficient of restitution
+
+
+def get_hex_vertices(center, radius, angle):
+    """Generate hexagon vertices with given rotation angle"""
+    vertices = []
+    for i in range(6):
+        theta = angle + math.radians(i * 60)
+        x = center[0] + radius * math.cos(theta)
+        y = center[1] + radius * math.sin(theta)
+        vertices.append((x, y))
+    return vertices
+
+
+def closest_point_on_segment(A, B, P):
+    """Find closest point on segment AB to point P"""
+    ax, ay = A
+    bx, by = B
+    px, py = P
+
+    abx = bx - ax
+    aby = by - ay
+    apx = px - ax
+    apy = py - ay
+
+    t = (apx * abx + apy * aby) / (abx**2 + aby**2 + 1e-8)
+    t = max(0, min(1, t))
+
+    return (ax + t * abx, ay + t * aby)
+
+
+class Simulation(base.Simulation):
+    name = "deepseek-r1"
+    frame_based = False
+    angle_attr = "rotation_angle"
+    angle_unit = 1.0
+
+    def __init__(self, hex_radius=HEX_RADIUS, ball_radius=BALL_RADIUS,
+                 gravity=GRAVITY, friction=FRICTION, omega=OMEGA, cor=COR):
+        self.center = CENTER
+        self.hex_radius = hex_radius
+        self.ball_radius = ball_radius
+        self.g = gravity
+        self.friction = friction
+        self.omega = omega
+        self.cor = cor
+        self.rotation_angle = 0
+        self.x = CENTER[0]
+        self.y = CENTER[1] - hex_radius + ball_radius + 5
+        self.vx, self.vy = 3, 0
+
+    def rotation(self):
+        return self.rotation_angle
+
+    def angular_velocity(self):
+        return self.omega
+
+    def gravity(self):
+        return self.g
+
+    def step(self, dt):
+        omega, center, radius = self.omega, self.center, self.ball_radius
+        self.rotation_angle += omega * dt
+        self.rotation_angle %= 2 * math.pi
+
+        vertices = get_hex_vertices(center, self.hex_radius, self.rotation_angle)
+
+        self.vy += self.g * dt
+        self.vx *= self.friction
+        self.vy *= self.friction
+
+        self.x += self.vx * dt
+        self.y += self.vy * dt
+
+        for i in range(6):
+            A = vertices[i]
+            B = vertices[(i+1) % 6]
+            closest = closest_point_on_segment(A, B, (self.x, self.y))
+
+            dx = self.x - closest[0]
+            dy = self.y - closest[1]
+            distance_sq = dx**2 + dy**2
+
+            if distance_sq < radius**2:
+                # Normal points inward, from the edge midpoint to the centre
+                midpoint = ((A[0] + B[0])/2, (A[1] + B[1])/2)
+                normal = (center[0] - midpoint[0], center[1] - midpoint[1])
+                norm_length = math.hypot(*normal)
+                if norm_length == 0:
+                    continue
+                normal = (normal[0]/norm_length, normal[1]/norm_length)
+
+                # Wall point velocity due to rotation
+                px, py = closest
+                vp_x = -omega * (py - center[1])
+                vp_y = omega * (px - center[0])
+
+                rel_vx = self.vx - vp_x
+                rel_vy = self.vy - vp_y
+                rel_norm = rel_vx * normal[0] + rel_vy * normal[1]
+
+                if rel_norm < 0:
+                    new_rel_vx = rel_vx - (1 + self.cor) * rel_norm * normal[0]
+                    new_rel_vy = rel_vy - (1 + self.cor) * rel_norm * normal[1]
+                    self.vx = new_rel_vx + vp_x
+                    self.vy = new_rel_vy + vp_y
+
+                    overlap = radius - math.sqrt(distance_sq)
+                    self.x += normal[0] * overlap
+                    self.y += normal[1] * overlap
+                    self.contacts += 1
+                    break
@@ -0,0 +1,103 @@
+"""Headless port of gemini-2.0.py."""
+import math
+
+from . import base
+from .base import FPS, HEIGHT, WIDTH
+
+GRAVITY = 0.5
+FRICTION = 0.98
+
+
+def point_in_triangle(px, py, x1, y1, x2, y2, x3, y3):
+    # Kept as written in the script, including the (y2 - y2) term in d2
+    d1 = (px - x1) * (y2 - y1) - (px - x2) * (y1 - x1)
+    d2 = (px - x2) * (y3 - y2) - (px - x3) * (y2 - y2)
+    d3 = (px - x3) * (y1 - y3) - (px - x1) * (y3 - y1)
+    has_neg = (d1 < 0) or (d2 < 0) or (d3 < 0)
+    has_pos = (d1 > 0) or (d2 > 0) or (d3 > 0)
+    return not (has_neg and has_pos)
+
+
+def ball_collision(ball_x, ball_y, ball_dx, ball_dy, center, radius, angle):
+    for i in range(6):
+        angle_rad = math.radians(angle + i * 60)
+        x1 = center[0] + radius * math.cos(angle_rad)
+        y1 = center[1] + radius * math.sin(angle_rad)
+
+        angle_rad_next = math.radians(angle + (i+1) * 60)
+        x2 = center[0] + radius * math.cos(angle_rad_next)
+        y2 = center[1] + radius * math.sin(angle_rad_next)
+
+        next_ball_x = ball_x + ball_dx
+        next_ball_y = ball_y + ball_dy
+
+        if point_in_triangle(next_ball_x, next_ball_y, x1, y1, x2, y2,
+                             center[0], center[1]):
+            nx = y2 - y1
+            ny = -(x2 - x1)
+            norm_length = math.sqrt(nx**2 + ny**2)
+            nx /= norm_length
+            ny /= norm_length
+
+            dot_product = ball_dx * nx + ball_dy * ny
+            ball_dx -= 2 * dot_product * nx
+            ball_dy -= 2 * dot_product * ny
+
+            ball_x += ball_dx * 0.1
+            ball_y += ball_dy * 0.1
+            break
+
+    return ball_x, ball_y, ball_dx, ball_dy
+
+
+class Simulation(base.Simulation):
+    name = "gemini-2.0"
+
+    def __init__(self, hex_radius=150, ball_radius=10, gravity=None,
+                 friction=FRICTION, omega=None):
+        self.center = (WIDTH // 2, HEIGHT // 2)
+        self.hex_radius = hex_radius
+        self.ball_radius = ball_radius
+        self.g = GRAVITY if gravity is None else gravity / FPS ** 2
+        self.friction = friction
+        # Degrees per frame
+        self.rotation_speed = 1 if omega is None else math.degrees(omega) / FPS
+        self.angle = 0
+        self.x, self.y = WIDTH // 2, HEIGHT // 4
+        self.vx, self.vy = 5, 0
+
+    def rotation(self):
+        return math.radians(self.angle)
+
+    def angular_velocity(self):
+        return math.radians(self.rotation_speed) * FPS
+
+    def gravity(self):
+        return self.g * FPS ** 2
+
+    def step(self, dt):
+        k = self.frames(dt)
+        self.angle = (self.angle + self.rotation_speed * k) % 360
+
+        self.x += self.vx * k
+        self.y += self.vy * k
+        self.vy += self.g * k
+
+        damping = self.friction ** k
+        self.vx *= damping
+        self.vy *= damping
+
+        vx, vy = self.vx, self.vy
+        self.x, self.y, self.vx, self.vy = ball_collision(
+            self.x, self.y, vx, vy, self.center, self.hex_radius, self.angle)
+        if (self.vx, self.vy) != (vx, vy):
+            self.contacts += 1
+
+        # Ball collision with screen edges
+        r = self.ball_radius
+        if self.x + r > WIDTH or self.x - r < 0:
+            self.vx *= -1
+            self.contacts += 1
+        if self.y + r > HEIGHT or self.y - r < 0:
+            self.vy *= -1
+            self.contacts += 1
@@ -0,0 +1,93 @@
+"""Headless port of 4o.py."""
+import math
+
+from . import base
+from .base import FPS, HEIGHT, WIDTH
+
+GRAVITY = 0.5
+FRICTION = 0.98
+
+
+def get_hexagon_points(center, radius, angle):
+    points = []
+    for i in range(6):
+        theta = math.radians(angle + i * 60)
+        x = center[0] + radius * math.cos(theta)
+        y = center[1] + radius * math.sin(theta)
+        points.append((x, y))
+    return points
+
+
+def reflect_ball(ball_pos, ball_velocity, point1, point2):
+    dx = point2[0] - point1[0]
+    dy = point2[1] - point1[1]
+    length = math.hypot(dx, dy)
+    if length == 0:
+        return
+
+    dx /= length
+    dy /= length
+    normal = [-dy, dx]
+
+    ball_to_line = [ball_pos[0] - point1[0], ball_pos[1] - point1[1]]
+    dot_product = ball_to_line[0] * normal[0] + ball_to_line[1] * normal[1]
+    if dot_product > 0:
+        normal = [-normal[0], -normal[1]]
+
+    dot = ball_velocity[0] * normal[0] + ball_velocity[1] * normal[1]
+    ball_velocity[0] -= 2 * dot * normal[0]
+    ball_velocity[1] -= 2 * dot * normal[1]
+
+
+class Simulation(base.Simulation):
+    name = "4o"
+
+    def __init__(self, hex_radius=200, ball_radius=10, gravity=None,
+                 friction=FRICTION, omega=None):
+        self.center = (WIDTH // 2, HEIGHT // 2)
+        self.hex_radius = hex_radius
+        self.ball_radius = ball_radius
+        self.g = GRAVITY if gravity is None else gravity / FPS ** 2
+        self.friction = friction
+        # Degrees per frame
+        self.rotation_speed = 1 if omega is None else math.degrees(omega) / FPS
+        self.angle = 0
+        self.x, self.y = WIDTH // 2, HEIGHT // 4
+        self.vx, self.vy = 2.0, 0.0
+
+    def rotation(self):
+        return math.radians(self.angle)
+
+    def angular_velocity(self):
+        return math.radians(self.rotation_speed) * FPS
+
+    def gravity(self):
+        return self.g * FPS ** 2
+
+    def step(self, dt):
+        k = self.frames(dt)
+        pos = [self.x, self.y]
+        vel = [self.vx, self.vy]
+        self.angle += self.rotation_speed * k
+        points = get_hexagon_points(self.center, self.hex_radius, self.angle)
+
+        vel[1] += self.g * k
+        pos[0] = int(pos[0] + vel[0] * k)
+        pos[1] = int(pos[1] + vel[1] * k)
+
+        damping = self.friction ** k
+        vel[0] *= damping
+        vel[1] *= damping
+
+        radius = self.ball_radius
+        for i in range(6):
+            point1 = points[i]
+            point2 = points[(i + 1) % 6]
+            ball_to_point1 = math.hypot(pos[0] - point1[0], pos[1] - point1[1])
+            ball_to_point2 = math.hypot(pos[0] - point2[0], pos[1] - point2[1])
+            if ball_to_point1 < radius or ball_to_point2 < radius:
+                reflect_ball(pos, vel, point1, point2)
+                self.contacts += 1
+
+        self.x, self.y = pos
+        self.vx, self.vy = vel
@@ -0,0 +1,132 @@
+"""Headless port of llama.py."""
+import math
+
+from . import base
+from .base import FPS, HEIGHT, WIDTH
+
+
+class Ball:
+    def __init__(self):
+        self.x = WIDTH // 2
+        self.y = HEIGHT // 2
+        self.vx = 5
+        self.vy = -10
+        self.radius = 10
+        self.friction = 0.98
+        self.gravity = 0.1
+
+    def update(self, k=1.0):
+        self.vy += self.gravity * k
+        self.x += self.vx * k
+        self.y += self.vy * k
+
+        damping = self.friction ** k
+        self.vx *= damping
+        self.vy *= damping
+
+        bounces = 0
+        if self.x - self.radius < 0 or self.x + self.radius > WIDTH:
+            self.vx = -self.vx
+            bounces += 1
+        if self.y - self.radius < 0 or self.y + self.radius > HEIGHT:
+            self.vy = -self.vy * 0.9  # Energy loss on bounce
+            bounces += 1
+        return bounces
+
+
+class Hexagon:
+    def __init__(self):
+        self.x = WIDTH // 2
+        self.y = HEIGHT // 2
+        self.size = 200
+        self.angle = 0
+        self.speed = 1
+
+    def update(self, k=1.0):
+        self.angle += self.speed * k
+
+
+class Simulation(base.Simulation):
+    name = "llama"
+    angle_attr = "hexagon.angle"
+    ball_attr = "ball"
+
+    def __init__(self, hex_radius=None, ball_radius=None, gravity=None,
+                 friction=None, omega=None):
+        self.ball = Ball()
+        self.hexagon = Hexagon()
+        if hex_radius is not None:
+            self.hexagon.size = hex_radius
+        if ball_radius is not None:
+            self.ball.radius = ball_radius
+        if gravity is not None:
+            self.ball.gravity = gravity / FPS ** 2
+        if friction is not None:
+            self.ball.friction = friction
+        if omega is not None:
+            self.hexagon.speed = math.degrees(omega) / FPS
+        self.center = (self.hexagon.x, self.hexagon.y)
+
+    @property
+    def hex_radius(self):
+        return self.hexagon.size
+
+    @property
+    def ball_radius(self):
+        return self.ball.radius
+
+    @property
+    def x(self):
+        return self.ball.x
+
+    @x.setter
+    def x(self, value):
+        self.ball.x = value
+
+    @property
+    def y(self):
+        return self.ball.y
+
+    @y.setter
+    def y(self, value):
+        self.ball.y = value
+
+    @property
+    def vx(self):
+        return self.ball.vx
+
+    @vx.setter
+    def vx(self, value):
+        self.ball.vx = value
+
+    @property
+    def vy(self):
+        return self.ball.vy
+
+    @vy.setter
+    def vy(self, value):
+        self.ball.vy = value
+
+    def rotation(self):
+        return math.radians(self.hexagon.angle)
+
+    def angular_velocity(self):
+        return math.radians(self.hexagon.speed) * FPS
+
+    def gravity(self):
+        return self.ball.gravity * FPS ** 2
+
+    def step(self, dt):
+        k = self.frames(dt)
+        ball, hexagon = self.ball, self.hexagon
+        hexagon.update(k)
+        self.contacts += ball.update(k)
+
+        # The script's collision test ignores rotation and angle of incidence
+        dx = ball.x - hexagon.x
+        dy = ball.y - hexagon.y
+        distance = math.sqrt(dx**2 + dy**2)
+        if distance < hexagon.size + ball.radius:
+            ball.vx = -ball.vx
+            ball.vy = -ball.vy
+            self.contacts += 1
@@ -0,0 +1,119 @@
+"""Headless port of o3-mini.py.
+
+The script works on ``pygame.math.Vector2``; the port does the same
+arithmetic on plain floats so it runs without pygame.
+"""
+import math
+
+from . import base
+from .base import HEIGHT, WIDTH
+
+BALL_RADIUS = 10
+GRAVITY = 300  # pixels per second²
+FRICTION = 0.999  # slight damping each frame
+RESTITUTION = 0.9
+HEX_RADIUS = 250
+SPIN_SPEED = math.radians(45)
+
+
+def compute_hexagon_vertices(center, radius, angle_offset):
+    """Returns a list of 6 vertices for a hexagon rotated by angle_offset."""
+    vertices = []
+    for i in range(6):
+        angle = angle_offset + math.radians(60 * i)
+        x = center[0] + radius * math.cos(angle)
+        y = center[1] + radius * math.sin(angle)
+        vertices.append((x, y))
+    return vertices
+
+
+def line_collision_response(ball_pos, ball_vel, A, B, hex_center,
+                            spin_speed=SPIN_SPEED, ball_radius=BALL_RADIUS,
+                            restitution=RESTITUTION):
+    """
+    Check collision of a circle (ball) with a line segment AB.
+    Returns updated ball_pos and ball_vel if collision occurs.
+    """
+    px, py = ball_pos
+    vx, vy = ball_vel
+    abx, aby = B[0] - A[0], B[1] - A[1]
+    t = ((px - A[0]) * abx + (py - A[1]) * aby) / (abx * abx + aby * aby)
+    t = max(0, min(1, t))
+    cx, cy = A[0] + abx * t, A[1] + aby * t
+    distance = math.hypot(px - cx, py - cy)
+
+    if distance < ball_radius:
+        # Collision normal points from wall to ball
+        if distance == 0:
+            nx, ny = 0.0, 1.0
+        else:
+            nx, ny = (px - cx) / distance, (py - cy) / distance
+
+        # v_wall = omega x r, where r = (closest - hex_center)
+        rx, ry = cx - hex_center[0], cy - hex_center[1]
+        wvx, wvy = -ry * spin_speed, rx * spin_speed
+
+        rvx, rvy = vx - wvx, vy - wvy
+        dot = rvx * nx + rvy * ny
+        if dot < 0:
+            rvx -= (1 + restitution) * dot * nx
+            rvy -= (1 + restitution) * dot * ny
+            vx, vy = rvx + wvx, rvy + wvy
+
+            overlap = ball_radius - distance
+            px += nx * overlap
+            py += ny * overlap
+
+    return (px, py), (vx, vy)
+
+
+class Simulation(base.Simulation):
+    name = "o3-mini"
+    frame_based = False
+    angle_attr = "hex_angle"
+    angle_unit = 1.0
+
+    def __init__(self, hex_radius=HEX_RADIUS, ball_radius=BALL_RADIUS,
+                 gravity=GRAVITY, friction=FRICTION, omega=SPIN_SPEED,
+                 restitution=RESTITUTION):
+        self.center = (WIDTH / 2, HEIGHT / 2)
+        self.hex_radius = hex_radius
+        self.ball_radius = ball_radius
+        self.g = gravity
+        self.friction = friction
+        self.spin_speed = omega
+        self.restitution = restitution
+        self.hex_angle = 0
+        self.x, self.y = WIDTH / 2, HEIGHT / 2
+        self.vx, self.vy = 200, -150
+
+    def rotation(self):
+        return self.hex_angle
+
+    def angular_velocity(self):
+        return self.spin_speed
+
+    def gravity(self):
+        return self.g
+
+    def step(self, dt):
+        self.hex_angle += self.spin_speed * dt
+        hex_vertices = compute_hexagon_vertices(self.center, self.hex_radius,
+                                                self.hex_angle)
+
+        self.vy += self.g * dt
+        pos = (self.x + self.vx * dt, self.y + self.vy * dt)
+        vel = (self.vx, self.vy)
+
+        for i in range(6):
+            before = vel
+            pos, vel = line_collision_response(
+                pos, vel, hex_vertices[i], hex_vertices[(i + 1) % 6],
+                self.center, self.spin_speed, self.ball_radius,
+                self.restitution)
+            if vel != before:
+                self.contacts += 1
+
+        self.x, self.y = pos
+        self.vx = vel[0] * self.friction
+        self.vy = vel[1] * self.friction
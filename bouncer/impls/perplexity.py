@@ -0,0 +1,144 @@
+"""Headless port of perplexity.py."""
+import math
+
+from . import base
+from .base import FPS, HEIGHT, WIDTH
+
+GRAVITY = 0.5
+FRICTION = 0.99
+
+
+class Ball:
+    def __init__(self, x, y, radius):
+        self.x = x
+        self.y = y
+        self.radius = radius
+        self.vx = 5
+        self.vy = 0
+
+    def update(self, gravity=GRAVITY, friction=FRICTION, k=1.0):
+        self.vy += gravity * k
+        self.x += self.vx * k
+        self.y += self.vy * k
+
+        damping = friction ** k
+        self.vx *= damping
+        self.vy *= damping
+
+
+class Hexagon:
+    def __init__(self, center_x, center_y, size):
+        self.center_x = center_x
+        self.center_y = center_y
+        self.size = size
+        self.angle = 0
+        self.speed = 1
+
+    def update(self, k=1.0):
+        self.angle += self.speed * k
+
+
+def check_collision(ball, hexagon):
+    hits = 0
+    for i in range(6):
+        angle1 = math.radians(60 * i + hexagon.angle)
+        angle2 = math.radians(60 * (i + 1) + hexagon.angle)
+
+        x1 = hexagon.center_x + hexagon.size * math.cos(angle1)
+        y1 = hexagon.center_y + hexagon.size * math.sin(angle1)
+
+        x2 = hexagon.center_x + hexagon.size * math.cos(angle2)
+        y2 = hexagon.center_y + hexagon.size * math.sin(angle2)
+
+        if line_circle_collision((x1, y1), (x2, y2), (ball.x, ball.y), ball.radius):
+            ball.vy *= -1  # Reverse vertical velocity on collision
+            hits += 1
+    return hits
+
+
+def line_circle_collision(p1, p2, circle_center, radius):
+    line_vec = (p2[0] - p1[0], p2[1] - p1[1])
+    circle_vec = (circle_center[0] - p1[0], circle_center[1] - p1[1])
+
+    line_len_sq = line_vec[0] ** 2 + line_vec[1] ** 2
+    if line_len_sq == 0:
+        return False
+
+    t = max(0, min(1, (circle_vec[0] * line_vec[0] + circle_vec[1] * line_vec[1]) / line_len_sq))
+
+    closest_point = (p1[0] + t * line_vec[0], p1[1] + t * line_vec[1])
+
+    dist_sq = (closest_point[0] - circle_center[0]) ** 2 + (closest_point[1] - circle_center[1]) ** 2
+
+    return dist_sq <= radius ** 2
+
+
+class Simulation(base.Simulation):
+    name = "perplexity"
+    angle_attr = "hexagon.angle"
+    ball_attr = "ball"
+
+    def __init__(self, hex_radius=200, ball_radius=15, gravity=None,
+                 friction=FRICTION, omega=None):
+        self.ball = Ball(WIDTH // 2, HEIGHT // 2, ball_radius)
+        self.hexagon = Hexagon(WIDTH // 2, HEIGHT // 2, hex_radius)
+        if omega is not None:
+            self.hexagon.speed = math.degrees(omega) / FPS
+        self.g = GRAVITY if gravity is None else gravity / FPS ** 2
+        self.friction = friction
+        self.center = (self.hexagon.center_x, self.hexagon.center_y)
+
+    @property
+    def hex_radius(self):
+        return self.hexagon.size
+
+    @property
+    def ball_radius(self):
+        return self.ball.radius
+
+    @property
+    def x(self):
+        return self.ball.x
+
+    @x.setter
+    def x(self, value):
+        self.ball.x = value
+
+    @property
+    def y(self):
+        return self.ball.y
+
+    @y.setter
+    def y(self, value):
+        self.ball.y = value
+
+    @property
+    def vx(self):
+        return self.ball.vx
+
+    @vx.setter
+    def vx(self, value):
+        self.ball.vx = value
+
+    @property
+    def vy(self):
+        return self.ball.vy
+
+    @vy.setter
+    def vy(self, value):
+        self.ball.vy = value
+
+    def rotation(self):
+        return math.radians(self.hexagon.angle)
+
+    def angular_velocity(self):
+        return math.radians(self.hexagon.speed) * FPS
+
+    def gravity(self):
+        return self.g * FPS ** 2
+
+    def step(self, dt):
+        k = self.frames(dt)
+        self.ball.update(self.g, self.friction, k)
+        self.hexagon.update(k)
+        self.contacts += check_collision(self.ball, self.hexagon)
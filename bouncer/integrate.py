@@ -0,0 +1,133 @@
+"""Integrators for the N-ball engine, and how large a step each can take.
+
+Every script bakes in its own explicit ordering: 4o.py and claude.py add
+gravity and then move (semi-implicit Euler), gemini-2.0.py moves and then
+adds gravity (explicit Euler), and friction is multiplied in per frame
+before or after the wall test. Here a scheme is a sequence of stages, each
+a KICK (update velocity) or a DRIFT (move at the current velocity) over a
+fraction of the step:
+
+* ``euler``: drift, kick. Gains ½ g² dt² of energy per step in flight.
+* ``semi-implicit``: kick, drift. Loses ½ g² dt² per step in flight; what
+  ``BallEngine`` has always done, and still the default.
+* ``verlet``: half kick, drift, half kick (velocity Verlet).
+* ``leapfrog``: half drift, kick, half drift (position Verlet).
+
+Under constant gravity the last two follow the exact parabola, so between
+wall contacts their only error is rounding.
+
+Damping is a rate in 1/s rather than a per-frame factor: a kick over h
+seconds solves dv/dt = g - k v exactly, v e^(-kh) + g (1 - e^(-kh)) / k,
+so the same run loses the same speed at any dt. ``rate`` converts a
+script's per-frame FRICTION multiplier.
+
+``max_dt`` measures, per scheme, the largest step that keeps the energy
+error within a tolerance, as a fraction of the energy of a drop across
+the default hexagon. It uses an elastic, non-spinning container and no
+damping, where energy should be conserved. In free flight (a container
+too large to reach) the error is the integrator's alone: explicit Euler
+and semi-implicit Euler drift at the same rate in opposite directions, so
+the error grows linearly with time and with dt, and Verlet and leapfrog
+are exact. With walls, a bounce lands somewhere inside a step while the
+kicks stay at fixed stages, which costs every scheme O(dt) per contact,
+so there the wall response, not the integrator, sets the largest step.
+Bigger tolerated steps are fewer steps per simulated second.
+"""
+import math
+
+import numpy as np
+
+KICK, DRIFT = range(2)
+
+SCHEMES = {
+    "euler": ((DRIFT, 1.0), (KICK, 1.0)),
+    "semi-implicit": ((KICK, 1.0), (DRIFT, 1.0)),
+    "verlet": ((KICK, 0.5), (DRIFT, 1.0), (KICK, 0.5)),
+    "leapfrog": ((DRIFT, 0.5), (KICK, 1.0), (DRIFT, 0.5)),
+}
+DEFAULT = "semi-implicit"
+LADDER = tuple(1 / 960 * 2 ** k for k in range(8))  # 1/960 s up to 1/7.5 s
+TOLERANCE = 0.05  # energy error for max_dt, as a fraction of a drop across the hexagon
+FREE_RADIUS = 1e6  # px; a container no ball reaches within the measurement
+
+
+def rate(per_frame, fps=60):
+    """Damping rate in 1/s equivalent to multiplying velocity by per_frame each frame."""
+    return -math.log(per_frame) * fps
+
+
+def kick(vel, gravity, damping, h):
+    """Advance velocities by h seconds of gravity (+y) and linear drag, in place."""
+    if damping:
+        decay = math.exp(-damping * h)
+        vel *= decay
+        vel[:, 1] += gravity * (1 - decay) / damping
+    else:
+        vel[:, 1] += gravity * h
+
+
+def drift(pos, vel, t, h):
+    """Move positions along the current velocities for h seconds, in place.
+
+    ``t`` is the time into the step at which the drift starts; the plain
+    drift ignores it, but a swept one needs the container angle there.
+    """
+    pos += vel * h
+
+
+def integrate(scheme, pos, vel, gravity, damping, dt, move=drift):
+    """Advance pos and vel by dt under ``scheme``, a key of SCHEMES, in place."""
+    t = 0.0
+    for stage, fraction in SCHEMES[scheme]:
+        h = fraction * dt
+        if stage == KICK:
+            kick(vel, gravity, damping, h)
+        else:
+            move(pos, vel, t, h)
+            t += h
+
+
+def energy(engine):
+    """Per-ball energy per unit mass, measured up from the container's lowest point."""
+    floor = engine.center[1] + engine.radius
+    v2 = np.einsum("ij,ij->i", engine.vel, engine.vel)
+    return 0.5 * v2 + engine.gravity * (floor - engine.pos[:, 1])
+
+
+def energy_error(scheme, dt, seconds=10.0, balls=200, seed=0, walls=True, **options):
+    """Worst mean energy error per ball over ``seconds`` in an elastic, still container.
+
+    The error is a fraction of the energy of a drop across the default
+    hexagon. Without walls the container is too large to reach.
+    """
+    from .engine import HEXAGON_RADIUS, BallEngine
+
+    if not walls:
+        options["radius"] = FREE_RADIUS
+    engine = BallEngine(balls, friction=1.0, omega=0.0, integrator=scheme, seed=seed,
+                        **options)
+    if not walls:
+        # Spawn in the default hexagon's area, far from the distant walls
+        engine.pos[:] = engine.center + (engine.pos - engine.center) * (HEXAGON_RADIUS
+                                                                        / FREE_RADIUS)
+    e0 = energy(engine)
+    scale = engine.gravity * 2 * HEXAGON_RADIUS
+    worst = 0.0
+    for _ in range(max(1, round(seconds / dt))):
+        engine.step(dt)
+        worst = max(worst, float(np.abs(energy(engine) - e0).mean() / scale))
+    return worst
+
+
+def max_dt(scheme, tolerance=TOLERANCE, ladder=LADDER, **options):
+    """Largest dt on ladder (ascending) whose energy error stays within tolerance.
+
+    Returns (dt or 0.0 if even the smallest fails, {dt: error} for the steps tried).
+    """
+    errors, best = {}, 0.0
+    for dt in ladder:
+        errors[dt] = energy_error(scheme, dt, **options)
+        if errors[dt] > tolerance:
+            break
+        best = dt
+    return best, errors
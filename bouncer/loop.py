@@ -0,0 +1,69 @@
+"""Fixed-timestep game loop with interpolated rendering.
+
+deepseek-r1.py and o3-mini.py integrate with whatever ``clock.tick()``
+returned, so one slow frame becomes one huge step; the frame-based scripts
+run physics at whatever the frame rate happens to be. This loop instead
+banks elapsed wall time in an accumulator and spends it in whole physics
+ticks of a fixed length, each split into ``substeps`` calls to ``step``.
+The renderer draws a blend of the last two physics states, so the frame
+rate can drop without the simulation result changing.
+"""
+import math
+
+from .impls.base import FPS
+
+MAX_FRAME_TIME = 0.25  # seconds; longer frames are clipped, not caught up
+
+
+def lerp_state(previous, current, alpha):
+    """Blend two ``render_state()`` results; alpha 0 is previous, 1 current.
+
+    The angle turns the short way, within (-π, π], so ports that wrap it
+    (deepseek-r1 at 2π, gemini-2.0 at 360°) do not spin back once a turn.
+    """
+    angle0, pos0 = previous
+    angle1, pos1 = current
+    turn = math.pi - (math.pi - (angle1 - angle0)) % (2 * math.pi)
+    angle = angle0 + turn * alpha
+    if hasattr(pos1, "shape"):
+        return angle, pos0 + (pos1 - pos0) * alpha
+    return angle, [(x0 + (x1 - x0) * alpha, y0 + (y1 - y0) * alpha)
+                   for (x0, y0), (x1, y1) in zip(pos0, pos1)]
+
+
+class FixedStepLoop:
+    def __init__(self, sim, rate=FPS, substeps=1, max_frame_time=MAX_FRAME_TIME,
+                 on_tick=None):
+        """``on_tick``, if given, is called with each tick's ``render_state()``."""
+        self.sim = sim
+        self.dt = 1.0 / rate
+        self.substeps = substeps
+        self.max_frame_time = max_frame_time
+        self.accumulator = 0.0
+        self.ticks = 0
+        self.on_tick = on_tick
+        self.previous = self.current = sim.render_state()
+
+    def tick(self):
+        """Run one fixed physics tick."""
+        step, sub_dt = self.sim.step, self.dt / self.substeps
+        for _ in range(self.substeps):
+            step(sub_dt)
+        self.previous, self.current = self.current, self.sim.render_state()
+        self.ticks += 1
+        if self.on_tick:
+            self.on_tick(*self.current)
+
+    def advance(self, frame_time):
+        """Bank frame_time seconds, run the whole ticks it pays for.
+
+        Returns the interpolation factor for drawing this frame.
+        """
+        self.accumulator += min(frame_time, self.max_frame_time)
+        while self.accumulator >= self.dt:
+            self.tick()
+            self.accumulator -= self.dt
+        return self.accumulator / self.dt
+
+    def interpolated(self, alpha):
+        return lerp_state(self.previous, self.current, alpha)
@@ -0,0 +1,114 @@
+"""Run every implementation over a grid of scenarios and compare them.
+
+Cases are spread over a process pool. Each result is cached on disk under a
+hash of its inputs: the original script, its port and ``impls/base.py``;
+this module, ``runner`` and ``accuracy``, which build, run and measure a
+case; and the case parameters. Re-running the matrix only recomputes cases
+whose inputs changed.
+"""
+import inspect
+import itertools
+import math
+import os
+import statistics
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+from . import accuracy, impls, runner
+from .cache import ResultCache, digest
+from .runner import run_headless
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+# Scenario axes; None keeps the script's own value. Velocities are px/s,
+# gravity px/s², omega rad/s. friction is handed to each script's own
+# friction constant, whatever that means there.
+DEFAULT_GRID = {
+    "velocity": [None, (300.0, 0.0), (600.0, -600.0)],
+    "gravity": [None, 900.0],
+    "friction": [None, 0.99],
+    "omega": [None, math.radians(180)],
+    "hex_radius": [None, 150],
+}
+
+
+def scenarios(grid=DEFAULT_GRID):
+    """Every combination of the grid's axes, as parameter dicts."""
+    keys = list(grid)
+    for values in itertools.product(*(grid[k] for k in keys)):
+        yield dict(zip(keys, values))
+
+
+def source_digest(name: str) -> str:
+    """Hash of everything that decides an implementation's results."""
+    files = [Path(impls.__file__).parent / "base.py",
+             Path(inspect.getfile(impls.load(name))),
+             Path(accuracy.__file__),
+             Path(__file__),  # make() and the scenario handling
+             Path(runner.__file__),
+             REPO_ROOT / f"{name}.py"]
+    return digest(*(f.read_bytes() for f in files if f.exists()))
+
+
+def make(name: str, scenario: dict):
+    params = dict(scenario)
+    velocity = params.pop("velocity")
+    sim = impls.create(name, **params)
+    if velocity is not None:
+        sim.set_ball(*sim.position(), *velocity)
+    return sim
+
+
+def run_case(name: str, scenario: dict, steps: int, dt: float) -> dict:
+    elapsed = run_headless(make(name, scenario), steps, dt)
+    result = accuracy.run(make(name, scenario), steps, dt).summary()
+    result["steps_per_sec"] = steps / elapsed if elapsed else math.inf
+    return result
+
+
+def run_matrix(names, grid=DEFAULT_GRID, steps=3600, dt=1 / 60,
+               workers=None, cache=None, progress=None):
+    """Return one record per (implementation, scenario) case."""
+    cache = ResultCache(namespace="matrix") if cache is None else cache
+    records, pending = [], []
+    for name in names:
+        source = source_digest(name)
+        for scenario in scenarios(grid):
+            key = digest(source, name, scenario, steps, dt)
+            record = {"impl": name, "scenario": scenario, "key": key}
+            result = cache.get(key)
+            if result is None:
+                pending.append(record)
+            else:
+                record.update(result, cached=True)
+            records.append(record)
+
+    if pending:
+        with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+            futures = {pool.submit(run_case, r["impl"], r["scenario"], steps, dt): r
+                       for r in pending}
+            for done, future in enumerate(as_completed(futures), 1):
+                record = futures[future]
+                result = future.result()
+                cache.put(record["key"], result)
+                record.update(result, cached=False)
+                if progress:
+                    progress(done, len(pending))
+    return records
+
+
+def summarize(records):
+    """Per-implementation aggregate over all scenarios."""
+    rows = []
+    for name, group in itertools.groupby(sorted(records, key=lambda r: r["impl"]),
+                                         key=lambda r: r["impl"]):
+        group = list(group)
+        rows.append({
+            "impl": name,
+            "cases": len(group),
+            "steps_per_sec": statistics.median(r["steps_per_sec"] for r in group),
+            "escaped_cases": sum(r["escapes"] > 0 for r in group),
+            "energy_drift": statistics.median(r["energy_drift"] for r in group),
+            "max_penetration": max(r["max_penetration"] for r in group),
+        })
+    return rows
@@ -0,0 +1,161 @@
+"""Monte Carlo study of how often, and how soon, each implementation loses the ball.
+
+Every trial starts the ball at the container centre with a random velocity
+drawn like the click handler of claude.py, ``np.random.uniform(-10, 10)``
+pixels per frame on each axis, i.e. ±600 px/s. Optionally the spin is
+drawn too. A trial escapes at the first step the ball centre is outside
+the container, by the same test as ``bouncer.accuracy``.
+
+Trial k of a study is seeded with ``(seed, k)``, so it is reproducible on
+its own. Trials are run on a process pool in chunks. Each finished chunk
+is cached on disk like a matrix case, so an interrupted study picks up
+where it stopped. Results stream into an ``EscapeAggregate`` as chunks
+complete, giving escape rates with Wilson score intervals, overall and
+binned by initial speed and by spin.
+"""
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import numpy as np
+
+from . import accuracy, impls
+from .cache import ResultCache, digest
+from .impls.base import FPS
+from .matrix import source_digest
+
+SPEED = 10 * FPS  # claude.py's reset: up to 10 px/frame on each axis
+CHUNK = 50  # trials per pool task
+Z95 = 1.959963984540054
+
+
+def wilson(successes, trials, z=Z95):
+    """Wilson score interval for a binomial proportion."""
+    if not trials:
+        return 0.0, 1.0
+    p = successes / trials
+    denom = 1 + z * z / trials
+    mid = (p + z * z / (2 * trials)) / denom
+    half = z * math.sqrt(p * (1 - p) / trials + z * z / (4 * trials * trials)) / denom
+    return max(0.0, mid - half), min(1.0, mid + half)
+
+
+def draw(seed, trial, speed=SPEED, omega=None):
+    """Initial (vx, vy, omega) of one trial; omega None keeps the script's spin."""
+    rng = np.random.default_rng((seed, trial))
+    vx, vy = rng.uniform(-speed, speed, 2)
+    spin = None if omega is None else float(rng.uniform(*omega))
+    return float(vx), float(vy), spin
+
+
+def run_trial(name, vx, vy, omega, steps, dt):
+    """Step of the first escape, or -1; and the spin actually used."""
+    sim = impls.create(name, omega=omega)
+    sim.set_ball(*sim.center, vx, vy)
+    outside = accuracy.run(sim, steps, dt).outside
+    first = int(outside.argmax()) if outside.any() else -1
+    return first, sim.angular_velocity()
+
+
+def run_chunk(name, seed, first, count, speed, omega, steps, dt):
+    """Rows of (trial, vx, vy, omega, escape step) for trials first .. first + count."""
+    rows = []
+    for trial in range(first, first + count):
+        vx, vy, spin = draw(seed, trial, speed, omega)
+        escape, spin = run_trial(name, vx, vy, spin, steps, dt)
+        rows.append([trial, vx, vy, spin, escape])
+    return rows
+
+
+class EscapeAggregate:
+    """Running escape statistics for one implementation."""
+
+    def __init__(self, name, speed=SPEED, omega=None, bins=4):
+        self.name = name
+        self.rows = []
+        # Bin edges: speed over |v| up to the corner of the velocity square,
+        # spin over the drawn range
+        self.speed_edges = np.linspace(0, speed * math.sqrt(2), bins + 1)
+        self.omega_edges = None if omega is None else np.linspace(*omega, bins + 1)
+
+    def add(self, rows):
+        self.rows.extend(rows)
+
+    def _rates(self, escape):
+        n, k = len(escape), int(np.count_nonzero(escape >= 0))
+        lo, hi = wilson(k, n)
+        return {"trials": n, "escapes": k, "rate": k / n if n else 0.0,
+                "ci_low": lo, "ci_high": hi}
+
+    def summary(self, dt):
+        if not self.rows:
+            return None
+        data = np.array(self.rows, dtype=float)
+        escape = data[:, 4]
+        result = {"impl": self.name, **self._rates(escape)}
+        steps = escape[escape >= 0]
+        if len(steps):
+            sem = steps.std(ddof=1) / math.sqrt(len(steps)) if len(steps) > 1 else math.inf
+            result.update(
+                median_escape_s=float(np.median(steps)) * dt,
+                mean_escape_s=float(steps.mean()) * dt,
+                mean_escape_ci_s=Z95 * sem * dt,
+            )
+
+        speed = np.hypot(data[:, 1], data[:, 2])
+        result["by_speed"] = self._binned(speed, self.speed_edges, escape)
+        if self.omega_edges is not None:
+            result["by_omega"] = self._binned(data[:, 3], self.omega_edges, escape)
+        return result
+
+    def _binned(self, values, edges, escape):
+        which = np.clip(np.searchsorted(edges, values, side="right") - 1, 0, len(edges) - 2)
+        return [{"low": float(edges[b]), "high": float(edges[b + 1]),
+                 **self._rates(escape[which == b])} for b in range(len(edges) - 1)]
+
+
+def run_study(names, trials=2000, steps=3600, dt=1 / 60, seed=0, speed=SPEED,
+              omega=None, chunk=CHUNK, bins=4, workers=None, cache=None, progress=None):
+    """Run ``trials`` trials of every implementation; return their aggregates.
+
+    ``progress(aggregate, done, total)`` is called after every chunk, cached
+    or fresh, with the aggregate it went into.
+    """
+    cache = ResultCache(namespace="montecarlo") if cache is None else cache
+    aggregates = {name: EscapeAggregate(name, speed, omega, bins) for name in names}
+    pending, done = [], 0
+    total = len(names) * math.ceil(trials / chunk)
+    for name in names:
+        source = digest(source_digest(name), Path(__file__).read_bytes())
+        for first in range(0, trials, chunk):
+            count = min(chunk, trials - first)
+            args = (name, seed, first, count, speed, omega, steps, dt)
+            key = digest(source, *args)
+            rows = cache.get(key)
+            if rows is None:
+                pending.append((key, args))
+                continue
+            aggregates[name].add(rows)
+            done += 1
+            if progress:
+                progress(aggregates[name], done, total)
+
+    if not pending:
+        return aggregates
+    pool = ProcessPoolExecutor(max_workers=workers or os.cpu_count())
+    try:
+        futures = {pool.submit(run_chunk, *args): (key, args[0]) for key, args in pending}
+        for future in as_completed(futures):
+            key, name = futures[future]
+            rows = future.result()
+            cache.put(key, rows)
+            aggregates[name].add(rows)
+            done += 1
+            if progress:
+                progress(aggregates[name], done, total)
+    finally:
+        # On Ctrl-C, drop the queued chunks instead of running them all
+        # first; everything finished so far is already cached
+        pool.shutdown(cancel_futures=True)
+    return aggregates
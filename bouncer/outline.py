@@ -0,0 +1,320 @@
+"""Spinning containers of any outline: concave shapes, mazes, shapes with holes.
+
+Every script, and ``bouncer.geometry``, assumes a regular polygon. Here a
+container is a set of segments in its own frame, loaded from a JSON file::
+
+    {"loops": [[[x, y], ...], ...], "paths": [[[x, y], ...], ...]}
+
+Loops are closed outlines (the boundary and any holes), paths are open
+polylines such as maze walls. Coordinates are pixels about the point the
+container spins around. Balls belong where a point is inside an odd number
+of loops.
+
+A ``SegmentBVH`` over the segments is built once in that frame. Each step
+the balls are turned into the frame, at the start angle and at the end
+angle, and the box around each ball's move is looked up in the tree, so a
+ball is tested against the few segments near its path, however many the
+outline has. Walls are two-sided. A ball whose centre crossed a segment
+during the step is sent back to the side it came from; otherwise the
+closest point on each nearby segment is used, as in claude.py's
+``check_collision``. The response is the one in ``bouncer.geometry``:
+reflect relative to the wall's own velocity and scale by friction. Further
+passes handle balls pushed into another wall in a corner; a ball wedged
+where it does not fit goes back to where it started the step.
+
+Units are pixels and seconds, as in ``bouncer.engine``.
+"""
+import json
+import math
+
+import numpy as np
+
+from .bvh import SegmentBVH
+from .engine import FRICTION, GRAVITY, OMEGA
+from .impls.base import FPS, HEIGHT, WIDTH
+
+PASSES = 3  # contact resolutions per ball per step
+SPAWN_TRIES = 100  # rounds of rejection sampling before giving up
+
+
+class Outline:
+    def __init__(self, loops=(), paths=()):
+        self.loops = [np.asarray(loop, dtype=float) for loop in loops]
+        self.paths = [np.asarray(path, dtype=float) for path in paths]
+        starts = [loop for loop in self.loops] + [path[:-1] for path in self.paths]
+        ends = [np.roll(loop, -1, axis=0) for loop in self.loops] + [path[1:] for path in self.paths]
+        if not starts:
+            raise ValueError("an outline needs at least one loop or path")
+        self.a, self.b = np.concatenate(starts), np.concatenate(ends)
+        self.edge = self.b - self.a
+        self.len2 = np.maximum(np.einsum("ij,ij->i", self.edge, self.edge), 1e-12)
+        # Segments [0, closed) belong to loops and count for inside tests
+        self.closed = sum(len(loop) for loop in self.loops)
+        self.bvh = SegmentBVH(self.a, self.b)
+        points = np.concatenate((self.a, self.b))
+        self.lo, self.hi = points.min(axis=0), points.max(axis=0)
+        self.radius = float(np.sqrt(np.einsum("ij,ij->i", points, points).max()))
+
+    def __len__(self):
+        return len(self.a)
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as f:
+            data = json.load(f)
+        return cls(data.get("loops", ()), data.get("paths", ()))
+
+    def save(self, path):
+        with open(path, "w") as f:
+            json.dump({"loops": [loop.tolist() for loop in self.loops],
+                       "paths": [p.tolist() for p in self.paths]}, f)
+
+    def contains(self, q):
+        """Whether each local point of q is inside, by the even-odd rule."""
+        q = np.asarray(q, dtype=float)
+        # Cast a ray towards +x; the tree gives the segments that can cut it
+        ray_hi = np.column_stack((np.full(len(q), self.hi[0] + 1), q[:, 1]))
+        i, s = self.bvh.query(q, ray_hi)
+        i, s = i[s < self.closed], s[s < self.closed]
+        a, e = self.a[s], self.edge[s]
+        y = q[i, 1]
+        spans = (a[:, 1] > y) != (a[:, 1] + e[:, 1] > y)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            x = a[:, 0] + (y - a[:, 1]) * e[:, 0] / e[:, 1]
+        cuts = spans & (q[i, 0] < x)
+        return np.bincount(i[cuts], minlength=len(q)) % 2 == 1
+
+    def clear(self, q, r):
+        """Whether each local point of q is at least r from every segment."""
+        i, s = self.bvh.query(q - r, q + r)
+        t = np.clip(np.einsum("ij,ij->i", q[i] - self.a[s], self.edge[s]) / self.len2[s], 0, 1)
+        o = q[i] - (self.a[s] + t[:, None] * self.edge[s])
+        close = np.einsum("ij,ij->i", o, o) < r * r
+        return np.bincount(i[close], minlength=len(q)) == 0
+
+
+class OutlineEngine:
+    """N balls under gravity in a spinning Outline."""
+
+    name = "outline"
+
+    def __init__(self, outline, n, center=(WIDTH / 2, HEIGHT / 2), ball_radius=4,
+                 gravity=GRAVITY, friction=FRICTION, omega=OMEGA, seed=None):
+        self.outline = outline
+        self.center = np.array(center, dtype=float)
+        self.ball_radius = ball_radius
+        self.gravity = gravity
+        self.friction = friction
+        self.omega = omega
+        self.angle = 0.0
+        self.contacts = 0
+        self.candidates = 0  # (ball, segment) pairs tested in the last step
+        self.pos = np.zeros((n, 2))
+        self.vel = np.zeros((n, 2))
+        self.spawn(np.random.default_rng(seed))
+
+    def __len__(self):
+        return len(self.pos)
+
+    def spawn(self, rng, speed=5 * FPS):
+        """Scatter balls over the inside of the outline, clear of its walls."""
+        n, found = len(self.pos), []
+        for _ in range(SPAWN_TRIES):
+            q = rng.uniform(self.outline.lo, self.outline.hi, (2 * n + 16, 2))
+            q = q[self.outline.contains(q) & self.outline.clear(q, self.ball_radius)]
+            found.append(q)
+            if sum(len(f) for f in found) >= n:
+                break
+        else:
+            raise ValueError("no room for the balls inside the outline")
+        self.pos[:] = self.to_world(np.concatenate(found)[:n], self.angle)
+        self.vel[:] = rng.uniform(-speed, speed, (n, 2))
+
+    def to_local(self, pos, angle):
+        c, s = math.cos(angle), math.sin(angle)
+        dx, dy = pos[:, 0] - self.center[0], pos[:, 1] - self.center[1]
+        return np.column_stack((c * dx + s * dy, c * dy - s * dx))
+
+    def to_world(self, q, angle):
+        c, s = math.cos(angle), math.sin(angle)
+        return np.column_stack((self.center[0] + c * q[:, 0] - s * q[:, 1],
+                                self.center[1] + s * q[:, 0] + c * q[:, 1]))
+
+    def render_state(self):
+        return self.angle, self.pos.copy()
+
+    def step(self, dt):
+        start, start_angle = self.pos.copy(), self.angle
+        self.angle += self.omega * dt
+        self.vel[:, 1] += self.gravity * dt
+        self.pos += self.vel * dt
+        self.collide(start, start_angle)
+
+    def collide(self, start, start_angle):
+        """Resolve wall contacts of the move from ``start`` at ``start_angle``."""
+        p0, p1 = self.to_local(start, start_angle), self.to_local(self.pos, self.angle)
+        c, s = math.cos(self.angle), math.sin(self.angle)
+        vx, vy = self.vel[:, 0], self.vel[:, 1]
+        u = np.column_stack((c * vx + s * vy, c * vy - s * vx))
+
+        balls, moved = np.arange(len(p1)), np.zeros(len(p1), dtype=bool)
+        self.candidates = 0
+        for _ in range(PASSES):
+            hit, q, v, _ = self._resolve(p0[balls], p1[balls], u[balls])
+            balls = balls[hit]
+            if not len(balls):
+                break
+            # Later passes keep the start, so a push through another wall,
+            # as in a sharp corner, shows up as a crossing and is undone
+            p1[balls], u[balls] = q, v
+            moved[balls] = True
+        else:
+            # Balls still pushed about after every pass are wedged somewhere
+            # too tight for them; any left across a wall go back to where
+            # they started, at rest against the container
+            hit, _, _, crossed = self._resolve(p0[balls], p1[balls], u[balls])
+            stuck = balls[hit][crossed]
+            p1[stuck] = p0[stuck]
+            u[stuck] = self.omega * np.column_stack((-p0[stuck, 1], p0[stuck, 0]))
+        self.contacts = int(moved.sum())
+        self.pos[moved] = self.to_world(p1[moved], self.angle)
+        self.vel[moved, 0] = c * u[moved, 0] - s * u[moved, 1]
+        self.vel[moved, 1] = s * u[moved, 0] + c * u[moved, 1]
+
+    def _resolve(self, p0, p1, u):
+        """One contact per ball moving p0 -> p1 in the local frame.
+
+        Returns the rows that hit something, their new positions and
+        velocities, and whether the contact was a crossing.
+        """
+        r, outline = self.ball_radius, self.outline
+        i, seg = outline.bvh.query(np.minimum(p0, p1) - r, np.maximum(p0, p1) + r)
+        self.candidates += len(i)
+        a, e = outline.a[seg], outline.edge[seg]
+        x0, x1 = p0[i], p1[i]
+
+        # Closest point on the segment at the end of the move
+        t = np.clip(np.einsum("ij,ij->i", x1 - a, e) / outline.len2[seg], 0, 1)
+        closest = a + t[:, None] * e
+        o = x1 - closest
+        dist = np.sqrt(np.einsum("ij,ij->i", o, o))
+
+        # Did the centre's path cut the segment? Both parameters in [0, 1]
+        d, w = x1 - x0, a - x0
+        denom = d[:, 0] * e[:, 1] - d[:, 1] * e[:, 0]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            along = (w[:, 0] * e[:, 1] - w[:, 1] * e[:, 0]) / denom
+            at = (w[:, 0] * d[:, 1] - w[:, 1] * d[:, 0]) / denom
+        crossed = (denom != 0) & (along >= 0) & (along <= 1) & (at >= 0) & (at <= 1)
+
+        # Unit normal of the segment, towards the side the ball came from
+        normal = np.column_stack((-e[:, 1], e[:, 0])) / np.sqrt(outline.len2[seg])[:, None]
+        normal *= np.where(np.einsum("ij,ij->i", x0 - a, normal) >= 0, 1.0, -1.0)[:, None]
+        past = -np.einsum("ij,ij->i", x1 - a, normal)
+        depth = np.where(crossed, r + past, r - dist)
+
+        # Per ball, the earliest crossing, or else the deepest overlap
+        keep = np.flatnonzero(crossed | (depth > 0))
+        keep = keep[np.lexsort((-depth[keep], np.where(crossed[keep], along[keep], 2.0), i[keep]))]
+        if len(keep):
+            keep = keep[np.r_[True, i[keep][1:] != i[keep][:-1]]]
+        rows, depth, crossed = i[keep], depth[keep], crossed[keep]
+        if not len(rows):
+            return rows, p1[rows], u[rows], crossed
+
+        gap = dist[keep][:, None]
+        n = np.where(crossed[:, None] | (gap < 1e-9), normal[keep], o[keep] / np.maximum(gap, 1e-9))
+        contact = np.where(crossed[:, None], a[keep] + at[keep, None] * e[keep], closest[keep])
+        q = p1[rows] + n * depth[:, None]
+
+        # Reflect relative to the wall point's velocity, omega x r
+        wall = self.omega * np.column_stack((-contact[:, 1], contact[:, 0]))
+        rel = u[rows] - wall
+        vn = np.einsum("ij,ij->i", rel, n)
+        into = vn < 0
+        rel[into] = (rel[into] - 2 * vn[into, None] * n[into]) * self.friction
+        return rows, q, rel + wall, crossed
+
+
+def star(points=7, outer=270, inner=130):
+    """A concave star."""
+    theta = np.arange(2 * points) * math.pi / points
+    radius = np.where(np.arange(2 * points) % 2, inner, outer)
+    return Outline([np.column_stack((radius * np.cos(theta), radius * np.sin(theta)))])
+
+
+def blob(segments=4096, radius=230, holes=3, seed=0):
+    """A wobbly closed curve of ``segments`` edges with round holes in it."""
+    rng = np.random.default_rng(seed)
+    theta = np.arange(segments) * 2 * math.pi / segments
+    r = radius * (1 + sum(rng.uniform(0.02, 0.08) * np.sin(k * theta + rng.uniform(0, 2 * math.pi))
+                          for k in (3, 5, 11, 29)))
+    loops = [np.column_stack((r * np.cos(theta), r * np.sin(theta)))]
+    ring = np.arange(128) * 2 * math.pi / 128
+    for k in range(holes):
+        phi = 2 * math.pi * k / holes
+        loops.append(np.column_stack((0.45 * radius * math.cos(phi) + 30 * np.cos(ring),
+                                      0.45 * radius * math.sin(phi) + 30 * np.sin(ring))))
+    return Outline(loops)
+
+
+def maze(cols=10, rows=10, cell=40, seed=0):
+    """A square maze: a closed border and a wall between cells the walk did not join."""
+    rng = np.random.default_rng(seed)
+    joined, seen, stack = set(), {(0, 0)}, [(0, 0)]
+    while stack:
+        x, y = stack[-1]
+        nexts = [(x + dx, y + dy) for dx, dy in ((1, 0), (-1, 0), (0, 1), (0, -1))
+                 if 0 <= x + dx < cols and 0 <= y + dy < rows and (x + dx, y + dy) not in seen]
+        if not nexts:
+            stack.pop()
+            continue
+        cell_next = nexts[rng.integers(len(nexts))]
+        joined.add(frozenset(((x, y), cell_next)))
+        seen.add(cell_next)
+        stack.append(cell_next)
+
+    x0, y0 = -cols * cell / 2, -rows * cell / 2
+    paths = []
+    for x in range(cols):
+        for y in range(rows):
+            if x + 1 < cols and frozenset(((x, y), (x + 1, y))) not in joined:
+                px = x0 + (x + 1) * cell
+                paths.append([(px, y0 + y * cell), (px, y0 + (y + 1) * cell)])
+            if y + 1 < rows and frozenset(((x, y), (x, y + 1))) not in joined:
+                py = y0 + (y + 1) * cell
+                paths.append([(x0 + x * cell, py), (x0 + (x + 1) * cell, py)])
+    border = [(x0, y0), (-x0, y0), (-x0, -y0), (x0, -y0)]
+    return Outline([border], paths)
+
+
+SHAPES = {"star": star, "blob": blob, "maze": maze}
+
+
+def show(engine, dt, steps=0, fps=FPS):
+    """Step engine in a pygame window, redrawing everything each frame."""
+    import pygame
+
+    pygame.init()
+    screen = pygame.display.set_mode((WIDTH, HEIGHT))
+    pygame.display.set_caption(f"{len(engine.outline)} segments, {len(engine)} balls")
+    clock = pygame.time.Clock()
+    outline, radius, done = engine.outline, int(engine.ball_radius), 0
+    running = True
+    while running and (not steps or done < steps):
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                running = False
+        engine.step(dt)
+        done += 1
+
+        screen.fill((0, 0, 0))
+        for points, closed in ([(loop, True) for loop in outline.loops]
+                               + [(path, False) for path in outline.paths]):
+            pygame.draw.lines(screen, (255, 255, 255), closed,
+                              engine.to_world(points, engine.angle).tolist(), 2)
+        for x, y in engine.pos.tolist():
+            pygame.draw.circle(screen, (255, 0, 0), (int(x), int(y)), radius)
+        pygame.display.flip()
+        clock.tick(fps)
+    pygame.quit()
@@ -0,0 +1,141 @@
+"""Per-phase frame profiler with an optional on-screen HUD.
+
+The windowed loop marks the end of each phase with ``lap``. Timings are
+``time.perf_counter_ns`` deltas written into a preallocated ``array`` ring
+buffer of int64, so recording a frame allocates no containers and does no
+formatting. Statistics are only computed when the HUD refreshes or when a
+dump is requested.
+"""
+import csv
+import json
+import math
+from array import array
+from time import perf_counter_ns
+
+# Phases of a windowed frame, in the order the loop runs them
+WAIT, EVENTS, PHYSICS, DRAW, PRESENT = range(5)
+PHASES = ("wait", "events", "physics", "draw", "present")
+
+CAPACITY = 1024  # frames kept
+MISS_FACTOR = 1.5  # a frame longer than this many budgets counts as missed
+
+
+class FrameProfiler:
+    def __init__(self, budget=1 / 60, capacity=CAPACITY, phases=PHASES):
+        self.phases = phases
+        self.width = len(phases) + 1  # phase columns plus the frame total
+        self.capacity = capacity
+        self.budget_ns = int(budget * 1e9)
+        self._data = array("q", bytes(8 * capacity * self.width))
+        self._frames = 0
+        self._row = 0
+        self._start = self._mark = 0
+
+    def start(self):
+        self._start = self._mark = perf_counter_ns()
+
+    def lap(self, phase):
+        """Charge the time since the last mark to ``phase``."""
+        now = perf_counter_ns()
+        self._data[self._row + phase] = now - self._mark
+        self._mark = now
+
+    def end(self):
+        self._data[self._row + self.width - 1] = self._mark - self._start
+        self._frames += 1
+        self._row = (self._frames % self.capacity) * self.width
+
+    @property
+    def count(self):
+        """Frames currently held, at most ``capacity``."""
+        return min(self._frames, self.capacity)
+
+    def rows(self):
+        """Recorded frames, oldest first, as lists of nanosecond values."""
+        n, w = self.count, self.width
+        first = self._frames - n
+        return [self._data[(f % self.capacity) * w:(f % self.capacity) * w + w].tolist()
+                for f in range(first, self._frames)]
+
+    def stats(self):
+        rows = self.rows()
+        if not rows:
+            return None
+        totals = sorted(r[-1] for r in rows)
+
+        def pct(p):
+            return totals[min(len(totals) - 1, math.ceil(p * len(totals)) - 1)] / 1e6
+
+        mean_total = sum(totals) / len(totals)
+        return {
+            "frames": len(rows),
+            "fps": 1e9 / mean_total if mean_total else math.inf,
+            "phase_ms": {name: sum(r[i] for r in rows) / len(rows) / 1e6
+                         for i, name in enumerate(self.phases)},
+            "frame_ms": mean_total / 1e6,
+            "p95_ms": pct(0.95),
+            "p99_ms": pct(0.99),
+            "missed": sum(t > MISS_FACTOR * self.budget_ns for t in totals),
+        }
+
+    def dump(self, path):
+        """Write the recorded frames to path, as JSON if it ends in .json, else CSV."""
+        first = self._frames - self.count
+        if str(path).endswith(".json"):
+            with open(path, "w") as f:
+                json.dump({"phases": list(self.phases), "stats": self.stats(),
+                           "frames_ns": self.rows(), "first_frame": first}, f)
+            return
+        with open(path, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["frame", *(f"{p}_ms" for p in self.phases), "frame_ms"])
+            for i, row in enumerate(self.rows(), first):
+                writer.writerow([i, *(f"{v / 1e6:.4f}" for v in row)])
+
+
+class Hud:
+    """Text overlay of the profiler's statistics, refreshed a few times a second."""
+
+    REFRESH_NS = 250_000_000
+
+    def __init__(self, profiler, color=(0, 255, 0), background=(0, 0, 0)):
+        import pygame
+
+        self.profiler = profiler
+        self.font = pygame.font.Font(None, 20)
+        self.color = color
+        self.background = background
+        self.visible = True
+        self._surface = None
+        self._refreshed = 0
+
+    def _render(self):
+        import pygame
+
+        s = self.profiler.stats()
+        if s is None:
+            return None
+        lines = [f"{s['fps']:5.1f} fps  frame {s['frame_ms']:.2f} ms  "
+                 f"p95 {s['p95_ms']:.2f}  p99 {s['p99_ms']:.2f}  missed {s['missed']}"]
+        lines += [f"{name:8s} {ms:7.3f} ms" for name, ms in s["phase_ms"].items()]
+        rendered = [self.font.render(line, True, self.color, self.background) for line in lines]
+        height = sum(r.get_height() for r in rendered)
+        surface = pygame.Surface((max(r.get_width() for r in rendered), height))
+        surface.fill(self.background)
+        y = 0
+        for r in rendered:
+            surface.blit(r, (0, y))
+            y += r.get_height()
+        return surface
+
+    def draw(self, screen):
+        """Blit the overlay; return its rect, or None when hidden."""
+        if not self.visible:
+            return None
+        now = perf_counter_ns()
+        if self._surface is None or now - self._refreshed > self.REFRESH_NS:
+            self._surface = self._render()
+            self._refreshed = now
+        if self._surface is None:
+            return None
+        return screen.blit(self._surface, (4, 4))
@@ -0,0 +1,198 @@
+"""Compact binary trajectory files with memory-mapped replay.
+
+A trajectory file is a 512-byte header followed by fixed-size records, one
+per step. The header is the magic ``BNCTRAJ1``, a little-endian uint32
+length and a JSON block with the run's parameters and record count. The
+file is preallocated for the planned number of steps. Records are buffered
+and written a chunk at a time, and the file is cut to the records actually
+written when it is closed.
+
+``Trajectory`` opens the records with ``numpy.memmap``, so any step can be
+reached without reading the file into memory.
+"""
+import itertools
+import json
+import struct
+
+import numpy as np
+
+MAGIC = b"BNCTRAJ1"
+HEADER_SIZE = 512
+CHUNK = 4096
+
+RECORD = np.dtype([
+    ("step", "<u8"),
+    ("angle", "<f8"),  # radians
+    ("x", "<f8"),
+    ("y", "<f8"),
+    ("vx", "<f8"),  # pixels per second
+    ("vy", "<f8"),
+    ("contact", "u1"),  # 1 if the ball bounced during this step
+])
+FIELDS = 6
+
+
+class TrajectoryWriter:
+    """Append per-step state of a Simulation to a trajectory file."""
+
+    def __init__(self, path, sim, dt, capacity, chunk=CHUNK):
+        self.path = path
+        self.sim = sim
+        self.meta = {
+            "impl": sim.name,
+            "dt": dt,
+            "center": list(sim.center),
+            "hex_radius": sim.hex_radius,
+            "sides": sim.sides,
+            "ball_radius": sim.ball_radius,
+            "count": 0,
+        }
+        self.count = 0
+        self._file = open(path, "wb+")
+        self._file.truncate(HEADER_SIZE + capacity * RECORD.itemsize)
+        self._write_header()
+        self._buffer = np.zeros(chunk, dtype=RECORD)
+        self._rows = [None] * chunk
+        self._pending = 0
+        self._sample = sim.sampler()
+        self._last_contacts = sim.contacts
+
+    def _write_header(self):
+        self.meta["count"] = self.count
+        blob = json.dumps(self.meta).encode()
+        header = MAGIC + struct.pack("<I", len(blob)) + blob
+        if len(header) > HEADER_SIZE:
+            raise ValueError("trajectory header does not fit in HEADER_SIZE bytes")
+        self._file.seek(0)
+        self._file.write(header.ljust(HEADER_SIZE, b"\0"))
+
+    def sample(self):
+        """Record the simulation's current state as the next step."""
+        self._rows[self._pending] = self._sample(self.sim)
+        self._pending += 1
+        if self._pending == len(self._rows):
+            self.flush()
+
+    def flush(self):
+        n = self._pending
+        if not n:
+            return
+        raw = np.fromiter(itertools.chain.from_iterable(self._rows[:n]), float, n * FIELDS)
+        x, y, vx, vy, angle, contacts = self.sim.convert(raw.reshape(n, FIELDS))
+        buf = self._buffer[:n]
+        buf["step"] = np.arange(self.count, self.count + n)
+        buf["angle"], buf["x"], buf["y"], buf["vx"], buf["vy"] = angle, x, y, vx, vy
+        buf["contact"] = np.diff(contacts, prepend=self._last_contacts) > 0
+        self._last_contacts = contacts[-1]
+
+        self._file.seek(HEADER_SIZE + self.count * RECORD.itemsize)
+        self._file.write(buf.tobytes())
+        self.count += n
+        self._pending = 0
+
+    def close(self):
+        if self._file.closed:
+            return
+        self.flush()
+        self._write_header()
+        self._file.truncate(HEADER_SIZE + self.count * RECORD.itemsize)
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def record(sim, path, steps, dt, chunk=CHUNK):
+    """Run sim headlessly for ``steps`` steps, writing every step to path."""
+    with TrajectoryWriter(path, sim, dt, steps, chunk) as writer:
+        step, sample = sim.step, writer.sample
+        for _ in range(steps):
+            step(dt)
+            sample()
+    return writer.count
+
+
+def read_header(path):
+    with open(path, "rb") as f:
+        head = f.read(HEADER_SIZE)
+    if head[:len(MAGIC)] != MAGIC:
+        raise ValueError(f"{path} is not a trajectory file")
+    (size,) = struct.unpack_from("<I", head, len(MAGIC))
+    return json.loads(head[len(MAGIC) + 4:len(MAGIC) + 4 + size])
+
+
+class Trajectory:
+    """Read-only, memory-mapped view of a trajectory file."""
+
+    def __init__(self, path):
+        self.meta = read_header(path)
+        count = self.meta["count"]
+        self.records = (np.memmap(path, dtype=RECORD, mode="r", offset=HEADER_SIZE,
+                                  shape=(count,))
+                        if count else np.zeros(0, dtype=RECORD))
+
+    def __len__(self):
+        return len(self.records)
+
+    def __getitem__(self, index):
+        return self.records[index]
+
+    def state(self, step):
+        """(angle, [(x, y)]) at step, in the form the renderer draws."""
+        r = self.records[step]
+        return float(r["angle"]), [(float(r["x"]), float(r["y"]))]
+
+
+def replay(path, start=0, fps=60):
+    """Play a trajectory in a pygame window.
+
+    Space pauses, left/right step one frame (ten with shift), Home and End
+    jump to either end. Playback advances one record per frame.
+    """
+    import pygame
+
+    from .impls.base import HEIGHT, WIDTH
+    from .render import Renderer
+
+    traj = Trajectory(path)
+    meta = traj.meta
+    if not len(traj):
+        return
+
+    pygame.init()
+    screen = pygame.display.set_mode((WIDTH, HEIGHT))
+    pygame.display.set_caption(f"Replay: {meta['impl']} ({path})")
+    clock = pygame.time.Clock()
+    renderer = Renderer(screen, meta["hex_radius"], meta["sides"])
+
+    step, paused, running = min(start, len(traj) - 1), False, True
+    while running:
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                running = False
+            elif event.type == pygame.KEYDOWN:
+                jump = 10 if event.mod & pygame.KMOD_SHIFT else 1
+                if event.key == pygame.K_SPACE:
+                    paused = not paused
+                elif event.key == pygame.K_RIGHT:
+                    step, paused = step + jump, True
+                elif event.key == pygame.K_LEFT:
+                    step, paused = step - jump, True
+                elif event.key == pygame.K_HOME:
+                    step = 0
+                elif event.key == pygame.K_END:
+                    step = len(traj) - 1
+        step = max(0, min(step, len(traj) - 1))
+
+        angle, positions = traj.state(step)
+        renderer.present(renderer.draw(meta["center"], angle, positions, meta["ball_radius"]))
+        if not paused:
+            step += 1
+            if step >= len(traj):
+                step, paused = len(traj) - 1, True
+        clock.tick(fps)
+
+    pygame.quit()
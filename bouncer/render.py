@@ -0,0 +1,174 @@
+"""Cached polygon outlines and dirty-rectangle display updates.
+
+Every script fills the whole 800x600 screen, redraws the polygon with
+``pygame.draw.polygon`` and flips the whole surface each frame, although
+only the ball and the outline change. Here the outline is rendered once
+per quantized rotation angle and blitted afterwards. Last frame's outline
+is erased by blitting the same shape in the background colour, which
+touches only the stroke pixels, and only the rectangles drawn this frame or
+last frame are pushed with ``pygame.display.update(rects)``.
+
+At coarse detail (``Renderer.coarse``) the outline comes from a cache with
+COARSE_STEPS angles and a 1 px stroke, and the balls are written as squares
+of the same area straight into the pixel array in one NumPy assignment
+instead of one ``pygame.draw.circle`` call each. The screen is then
+cleared and pushed whole, which with many balls beats tracking their
+rectangles.
+
+A backdrop surface (``Renderer.set_backdrop``), such as a heatmap layer,
+replaces the background fill. It only works with whole-screen redraws,
+since the dirty-rectangle path erases in the background colour.
+"""
+import math
+
+import numpy as np
+import pygame
+
+BLACK = (0, 0, 0)
+WHITE = (255, 255, 255)
+RED = (255, 0, 0)
+
+ANGLE_STEPS = 360  # cached outlines per symmetry period
+COARSE_STEPS = 45  # the same at coarse detail
+MAX_RECTS = 64  # beyond this, push one bounding rectangle instead
+
+
+class OutlineCache:
+    """Pre-rendered outlines of a regular polygon at quantized angles.
+
+    A regular N-gon looks the same after a turn of 2π/N, so only that much
+    of a turn is cached, in ANGLE_STEPS surfaces built on first use.
+    ``color`` is the stroke colour; an eraser cache is simply another
+    OutlineCache stroked in the background colour.
+    """
+
+    def __init__(self, radius, sides=6, color=WHITE, width=2, steps=ANGLE_STEPS):
+        self.radius = radius
+        self.sides = sides
+        self.color = color
+        self.width = width
+        self.steps = steps
+        self.period = 2 * math.pi / sides
+        self.size = math.ceil(2 * radius + 2 * width + 2)
+        self.key = (255, 0, 255) if color != (255, 0, 255) else (0, 255, 0)
+        self._surfaces = [None] * steps
+
+    def index(self, angle):
+        return round((angle % self.period) / self.period * self.steps) % self.steps
+
+    def get(self, angle):
+        return self.at(self.index(angle))
+
+    def at(self, i):
+        surface = self._surfaces[i]
+        if surface is None:
+            surface = self._surfaces[i] = self._build(i * self.period / self.steps)
+        return surface
+
+    def _build(self, angle):
+        surface = pygame.Surface((self.size, self.size))
+        surface.fill(self.key)
+        half = self.size / 2
+        points = [(half + self.radius * math.cos(angle + i * self.period),
+                   half + self.radius * math.sin(angle + i * self.period))
+                  for i in range(self.sides)]
+        pygame.draw.polygon(surface, self.color, points, self.width)
+        surface.set_colorkey(self.key, pygame.RLEACCEL)
+        if pygame.display.get_surface() is not None:
+            surface = surface.convert()
+        return surface
+
+
+class Renderer:
+    """Draws a container and its balls, updating only what changed."""
+
+    def __init__(self, screen, radius, sides=6, background=BLACK, outline=WHITE,
+                 ball=RED, width=2, dirty_rects=True):
+        self.screen = screen
+        self.background = background
+        self.ball_color = ball
+        self.outlines = OutlineCache(radius, sides, outline, width)
+        self.erasers = OutlineCache(radius, sides, background, width)
+        self.coarse_outlines = OutlineCache(radius, sides, outline, 1, COARSE_STEPS)
+        self.dirty_rects = dirty_rects
+        self.coarse = False
+        self.backdrop = None
+        self._last = []
+        self._outline = None  # (cache index, rect) drawn last frame
+        screen.fill(background)
+        if screen is pygame.display.get_surface():
+            pygame.display.flip()
+
+    def set_coarse(self, coarse):
+        """Switch detail; the next frame repaints the whole screen."""
+        if coarse == self.coarse:
+            return
+        self.coarse = coarse
+        self.screen.fill(self.background)
+        self._last = [self.screen.get_rect()]
+        self._outline = None
+
+    def set_backdrop(self, surface):
+        """Draw over surface instead of the background colour (None for the colour)."""
+        self.backdrop = surface
+
+    def _clear(self):
+        if self.backdrop is None:
+            self.screen.fill(self.background)
+        else:
+            self.screen.blit(self.backdrop, (0, 0))
+
+    def draw(self, center, angle, positions, ball_radius):
+        """Draw one frame; return the rectangles touched."""
+        if self.coarse:
+            return self._draw_coarse(center, angle, positions, ball_radius)
+        screen = self.screen
+        if not self.dirty_rects:
+            self._clear()
+        else:
+            # Balls are small, so clearing their boxes is cheap; the outline's
+            # box is not, so only its stroke pixels are painted over
+            for rect in self._last[1:]:
+                screen.fill(self.background, rect)
+            if self._outline is not None:
+                index, rect = self._outline
+                screen.blit(self.erasers.at(index), rect)
+
+        index = self.outlines.index(angle)
+        outline = self.outlines.at(index)
+        rect = outline.get_rect(center=(round(center[0]), round(center[1])))
+        self._outline = index, rect
+        drawn = [screen.blit(outline, rect)]
+        radius, color = int(ball_radius), self.ball_color
+        for x, y in positions:
+            drawn.append(pygame.draw.circle(screen, color, (int(x), int(y)), radius))
+        return drawn
+
+    def _draw_coarse(self, center, angle, positions, ball_radius):
+        screen = self.screen
+        self._clear()
+        outline = self.coarse_outlines.get(angle)
+        screen.blit(outline, outline.get_rect(center=(round(center[0]), round(center[1]))))
+
+        pos = np.asarray(positions, dtype=float).reshape(-1, 2)
+        side = max(1, round(ball_radius * math.sqrt(math.pi)))
+        width, height = screen.get_size()
+        x = np.clip(pos[:, 0].astype(int) - side // 2, 0, width - side)
+        y = np.clip(pos[:, 1].astype(int) - side // 2, 0, height - side)
+        offsets = np.arange(side)
+        color = screen.map_rgb(self.ball_color)
+        pixels = pygame.surfarray.pixels2d(screen)
+        pixels[x[:, None, None] + offsets[:, None], y[:, None, None] + offsets] = color
+        del pixels  # unlocks the surface
+        return [screen.get_rect()]
+
+    def present(self, drawn):
+        """Push this frame's and last frame's rectangles to the display."""
+        if not self.dirty_rects:
+            pygame.display.flip()
+            return
+        rects = self._last + drawn
+        if len(rects) > MAX_RECTS:
+            rects = [rects[0].unionall(rects[1:])]
+        pygame.display.update(rects)
+        self._last = drawn
@@ -0,0 +1,123 @@
+"""Drive a Simulation headlessly or in a pygame window."""
+import time
+
+from .impls.base import FPS, HEIGHT, WIDTH
+from .loop import FixedStepLoop
+
+
+def run_headless(sim, steps: int, dt: float) -> float:
+    """Step sim with no window and no frame cap; return elapsed seconds."""
+    step = sim.step
+    start = time.perf_counter()
+    for _ in range(steps):
+        step(dt)
+    return time.perf_counter() - start
+
+
+def run_window(sim, dt: float, steps: int = 0, fps: int = FPS, substeps: int = 1,
+               dirty_rects: bool = True, hud: bool = False, profile_out: str = None,
+               govern: bool = False, heatmap: str = None):
+    """Show sim in a window until closed or ``steps`` physics ticks have run.
+
+    Physics advances in fixed ticks of dt seconds, each split into
+    ``substeps``; drawing is capped at fps (0 for uncapped) and interpolates
+    between ticks. Only the regions that changed are pushed to the display
+    unless dirty_rects is false.
+
+    With hud or profile_out set, every frame is timed per phase. F3 toggles
+    the overlay; F12, and closing the window, write the recorded frames to
+    profile_out (CSV, or JSON if the name ends in .json).
+
+    With govern set, a ``governor.QualityGovernor`` trades substeps, the
+    HUD, render rate and draw detail for frame time, and logs each change.
+
+    With heatmap set, every physics tick is counted into a
+    ``heatmap.Heatmap`` drawn behind the scene (H switches between the world
+    and rotating frames), and the counts are saved to that path on exit.
+    """
+    import pygame
+
+    from . import profiler
+    from .governor import QualityGovernor
+    from .render import Renderer
+
+    pygame.init()
+    screen = pygame.display.set_mode((WIDTH, HEIGHT))
+    pygame.display.set_caption(f"Bouncing Ball in Spinning Hexagon ({sim.name})")
+    clock = pygame.time.Clock()
+    heat = None
+    if heatmap:
+        from .heatmap import REFRESH, Heatmap
+
+        heat = Heatmap(sim.center)
+        dirty_rects = False  # the layer changes under the whole container
+    loop = FixedStepLoop(sim, 1 / dt, substeps, on_tick=heat.add if heat else None)
+    renderer = Renderer(screen, sim.hex_radius, sim.sides, dirty_rects=dirty_rects)
+    frames = 0
+
+    prof = overlay = None
+    if hud or profile_out:
+        prof = profiler.FrameProfiler(1 / fps if fps else dt)
+        overlay = profiler.Hud(prof)
+        overlay.visible = hud
+    governor = QualityGovernor(fps, dt, substeps, decor=hud) if govern else None
+    quality = governor.quality if governor else None
+    cap = fps
+
+    running = True
+    while running and (not steps or loop.ticks < steps):
+        if prof:
+            prof.start()
+        frame_time = clock.tick(cap) / 1000
+        busy_start = time.perf_counter()
+        if prof:
+            prof.lap(profiler.WAIT)
+
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                running = False
+            elif heat and event.type == pygame.KEYDOWN and event.key == pygame.K_h:
+                heat.toggle()
+                frames = 0
+            elif prof and event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_F3:
+                    overlay.visible = not overlay.visible
+                elif event.key == pygame.K_F12 and profile_out:
+                    prof.dump(profile_out)
+        if prof:
+            prof.lap(profiler.EVENTS)
+
+        alpha = loop.advance(frame_time)
+        if prof:
+            prof.lap(profiler.PHYSICS)
+
+        if heat and frames % REFRESH == 0:
+            renderer.set_backdrop(heat.surface())
+        frames += 1
+        angle, positions = loop.interpolated(alpha)
+        drawn = renderer.draw(sim.center, angle, positions, sim.ball_radius)
+        if prof:
+            if quality is None or quality.decor:
+                rect = overlay.draw(screen)
+                if rect is not None:
+                    drawn.append(rect)
+            prof.lap(profiler.DRAW)
+
+        renderer.present(drawn)
+        if prof:
+            prof.lap(profiler.PRESENT)
+            prof.end()
+
+        if governor:
+            changed = governor.update(time.perf_counter() - busy_start)
+            if changed:
+                quality = changed
+                loop.substeps = quality.substeps
+                renderer.set_coarse(quality.coarse)
+                cap = (fps or FPS) // quality.divisor if quality.divisor > 1 else fps
+
+    if profile_out:
+        prof.dump(profile_out)
+    if heat:
+        heat.save(heatmap)
+    pygame.quit()
@@ -0,0 +1,200 @@
+"""N-ball engine split across worker processes over shared memory.
+
+One process runs ``BallEngine`` on one core however many balls it holds.
+``ShardedEngine`` keeps the positions and velocities of all the balls in
+``multiprocessing.shared_memory`` blocks and starts one worker per shard,
+a contiguous range of ball indices. Each worker runs a ``BallEngine`` whose
+``pos`` and ``vel`` are views of its range, so it steps its balls in place
+and nothing is copied between processes; the parent, and a renderer
+drawing from it, reads the same buffers.
+
+With wall-only physics every ball is independent, so splitting by index
+needs no exchange between shards. Ball-ball collisions would need halos
+across shard boundaries and are not supported; ``ccd`` and ``sleep``
+work per shard as they do in one engine.
+
+Steps are kept in lockstep with barriers. ``step(dt)`` releases the
+workers for one step and waits for all of them to finish, so a caller such
+as ``FixedStepLoop`` always sees every shard at the same tick. ``run``
+hands the workers a batch of steps, which they take in lockstep among
+themselves with a per-step barrier, before reporting back once. Each
+worker keeps its own copy of the container angle; the additions are the
+same in every process, so the copies agree with ``angle`` here exactly.
+``reset``, as a mouse click sends, goes to the workers the same way; each
+respawns its own range of balls.
+"""
+import math
+import os
+import time
+from multiprocessing import get_context, shared_memory
+
+import numpy as np
+
+from .engine import BallEngine
+
+STEP, STOP, RESET = range(3)
+CONTROL = 3  # command, steps, dt
+
+
+def _shared(shape, dtype=np.float64):
+    """A zeroed shared memory block and an array over it."""
+    size = max(1, math.prod(shape) * np.dtype(dtype).itemsize)
+    shm = shared_memory.SharedMemory(create=True, size=size)
+    array = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+    array[...] = 0
+    return shm, array
+
+
+def _attach(name, shape, dtype=np.float64):
+    shm = shared_memory.SharedMemory(name=name)
+    return shm, np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+
+
+def _worker(index, names, n, workers, lo, hi, options, start, step_barrier):
+    """Step balls lo:hi of the shared state until told to stop."""
+    blocks = [_attach(names["pos"], (n, 2)), _attach(names["vel"], (n, 2)),
+              _attach(names["control"], (CONTROL,)),
+              _attach(names["contacts"], (workers,), np.int64)]
+    (_, pos), (_, vel), (_, control), (_, contacts) = blocks
+    engine = BallEngine(hi - lo, **options)
+    engine.pos, engine.vel = pos[lo:hi], vel[lo:hi]
+    try:
+        while True:
+            start.wait()
+            if control[0] == STOP:
+                break
+            if control[0] == RESET:
+                engine.reset()
+            steps, dt = int(control[1]), float(control[2])
+            for i in range(steps):
+                if i:
+                    step_barrier.wait()
+                engine.step(dt)
+            contacts[index] = engine.contacts
+            start.wait()
+    except BaseException:
+        start.abort()
+        step_barrier.abort()
+        raise
+    finally:
+        del engine, pos, vel, control, contacts
+        for shm, _ in blocks:
+            shm.close()
+
+
+class ShardedEngine:
+    """BallEngine physics for n balls on ``workers`` processes."""
+
+    name = "sharded"
+
+    def __init__(self, n, workers=None, seed=None, **options):
+        """Options are BallEngine's, except ball_collisions."""
+        if options.get("ball_collisions"):
+            raise ValueError("ball-ball collisions cannot be sharded by index")
+        self.workers = max(1, min(workers or os.cpu_count(), n))
+        template = BallEngine(n, seed=seed, **options)
+        self.center = template.center
+        self.radius = template.radius
+        self.sides = template.sides
+        self.ball_radius = template.ball_radius
+        self.omega = template.omega
+        self.angle = template.angle
+        self.bounds = np.linspace(0, n, self.workers + 1).astype(int)
+
+        self._blocks = []
+        for key, shape, dtype in (("pos", (n, 2), np.float64), ("vel", (n, 2), np.float64),
+                                  ("control", (CONTROL,), np.float64),
+                                  ("contacts", (self.workers,), np.int64)):
+            shm, array = _shared(shape, dtype)
+            self._blocks.append((key, shm))
+            setattr(self, "_" + key, array)
+        self._pos[:], self._vel[:] = template.pos, template.vel
+        del template
+
+        ctx = get_context()
+        self._start = ctx.Barrier(self.workers + 1)
+        step_barrier = ctx.Barrier(self.workers)
+        names = {key: shm.name for key, shm in self._blocks}
+        options = {k: v for k, v in options.items() if k != "ball_collisions"}
+        options["center"] = tuple(self.center)
+        self._procs = [
+            ctx.Process(target=_worker, daemon=True,
+                        args=(i, names, n, self.workers, int(self.bounds[i]),
+                              int(self.bounds[i + 1]), options, self._start, step_barrier))
+            for i in range(self.workers)
+        ]
+        for p in self._procs:
+            p.start()
+        self._closed = False
+
+    def __len__(self):
+        return len(self._pos)
+
+    @property
+    def pos(self):
+        """Positions of every ball, the shared array itself."""
+        return self._pos
+
+    @property
+    def vel(self):
+        return self._vel
+
+    @property
+    def hex_radius(self):
+        return self.radius
+
+    @property
+    def contacts(self):
+        return int(self._contacts.sum())
+
+    def render_state(self):
+        return self.angle, self._pos.copy()
+
+    def _command(self, command, steps=0, dt=0.0):
+        self._control[:] = command, steps, dt
+        self._start.wait()  # release the workers
+        if command != STOP:
+            self._start.wait()  # and wait for the last of them
+
+    def reset(self):
+        """Respawn every ball, each shard its own range from a fresh generator."""
+        self._command(RESET)
+
+    def step(self, dt):
+        self.run(1, dt)
+
+    def run(self, steps, dt):
+        """Take ``steps`` steps of dt on every shard; return elapsed seconds."""
+        start = time.perf_counter()
+        if steps:
+            self._command(STEP, steps, dt)
+            for _ in range(steps):
+                self.angle += self.omega * dt
+        return time.perf_counter() - start
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            self._command(STOP)
+        except Exception:
+            pass  # a worker died and broke the barrier; terminate below
+        for p in self._procs:
+            p.join(timeout=5)
+            if p.is_alive():
+                p.terminate()
+        self._pos = self._vel = self._control = self._contacts = None
+        for _, shm in self._blocks:
+            shm.close()
+            shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __del__(self):
+        if not getattr(self, "_closed", True):
+            self.close()
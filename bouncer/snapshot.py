@@ -0,0 +1,199 @@
+"""Capture a simulation at one step, restore it, and fork what-if branches.
+
+Chasing a rare collision bug, such as gemini-2.0 tunneling through a wall
+or 4o truncating the ball position to ints, means replaying a run from
+step 0 every time. A ``Snapshot`` holds the exact state at a step instead:
+the simulation object pickled whole, so every attribute comes back bit for
+bit (ints stay ints), the step count and simulated time, and the state of
+the ``random`` and ``np.random`` global generators that ``reset`` and the
+scripts draw from. The container angle, spin and ball states are also
+stored in common units (radians, pixels, pixels per second) for reading
+without unpickling anything.
+
+``restore`` is one ``pickle.loads`` of a few hundred bytes for a script
+port, so ``fork`` can afford thousands of branches. Each branch restores
+the snapshot, applies its own perturbation (``tune`` for gravity, friction
+and spin in common units, ``nudge`` for the ball) and runs on from there
+under ``bouncer.accuracy``. Branches are run in chunks on a process pool
+as in ``bouncer.montecarlo``; the snapshot is sent once per chunk.
+"""
+import math
+import os
+import pickle
+import random
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from . import accuracy, impls
+from .impls.base import Simulation
+
+CHUNK = 100  # branches per pool task
+TUNABLE = ("gravity", "friction", "omega")
+
+Snapshot = namedtuple("Snapshot", "impl steps time angle omega balls rng state")
+
+
+def ball_states(sim):
+    """(N, 4) array of x, y, vx, vy in pixels and pixels per second."""
+    if isinstance(sim, Simulation):
+        return np.array([[*sim.position(), *sim.velocity()]], dtype=float)
+    return np.hstack((sim.pos, sim.vel))
+
+
+def capture(sim, steps=0, time=0.0):
+    """Snapshot of sim after ``steps`` steps and ``time`` simulated seconds."""
+    if isinstance(sim, Simulation):
+        angle, omega = sim.rotation(), sim.angular_velocity()
+    else:
+        angle, omega = sim.angle, sim.omega
+    return Snapshot(sim.name, steps, time, float(angle), float(omega), ball_states(sim),
+                    (random.getstate(), np.random.get_state()),
+                    pickle.dumps(sim, pickle.HIGHEST_PROTOCOL))
+
+
+def restore(snapshot, rng=True):
+    """A new simulation in the snapshot's state.
+
+    With rng set, the global ``random`` and ``np.random`` generators are
+    put back as they were too.
+    """
+    if rng:
+        random.setstate(snapshot.rng[0])
+        np.random.set_state(snapshot.rng[1])
+    return pickle.loads(snapshot.state)
+
+
+def advance(sim, steps, dt, snapshot=None):
+    """Step sim ``steps`` times; return a Snapshot of where it ends up.
+
+    Step count and time carry on from ``snapshot`` if given.
+    """
+    step = sim.step
+    for _ in range(steps):
+        step(dt)
+    done, elapsed = (snapshot.steps, snapshot.time) if snapshot else (0, 0.0)
+    return capture(sim, done + steps, elapsed + steps * dt)
+
+
+def save(snapshot, path):
+    with open(path, "wb") as f:
+        pickle.dump(snapshot, f, pickle.HIGHEST_PROTOCOL)
+
+
+def load(path):
+    with open(path, "rb") as f:
+        return pickle.load(f)
+
+
+def _paths(a, b, prefix=""):
+    """Dotted attribute paths where objects a and b differ, with b's values."""
+    for key, value in vars(b).items():
+        other = getattr(a, key, None)
+        if hasattr(value, "__dict__") and not isinstance(value, np.ndarray):
+            yield from _paths(other, value, f"{prefix}{key}.")
+        elif pickle.dumps(other) != pickle.dumps(value):
+            yield prefix + key, value
+
+
+def tune(sim, **params):
+    """Change gravity (px/s²), friction or omega (rad/s) of sim in place.
+
+    Every port keeps these in its own units and attributes. The attributes
+    are found by building the port with and without the parameters and
+    comparing the two; none of the three touches the initial ball or
+    container state, so only parameters are copied.
+    """
+    params = {k: v for k, v in params.items() if v is not None}
+    unknown = set(params) - set(TUNABLE)
+    if unknown:
+        raise ValueError(f"cannot tune {', '.join(sorted(unknown))}")
+    if not params:
+        return sim
+    if not isinstance(sim, Simulation):
+        for key, value in params.items():
+            setattr(sim, key, value)
+        return sim
+    for path, value in _paths(impls.create(sim.name), impls.create(sim.name, **params)):
+        *owners, attr = path.split(".")
+        target = sim
+        for owner in owners:
+            target = getattr(target, owner)
+        setattr(target, attr, value)
+    return sim
+
+
+def nudge(sim, dx=0.0, dy=0.0, dvx=0.0, dvy=0.0):
+    """Move the ball of a script port by pixels and pixels per second."""
+    if dx or dy or dvx or dvy:
+        (x, y), (vx, vy) = sim.position(), sim.velocity()
+        sim.set_ball(x + dx, y + dy, vx + dvx, vy + dvy)
+    return sim
+
+
+def run_branch(snapshot, branch, steps, dt):
+    """Escape step (or -1), final x and y, and worst penetration of one branch."""
+    sim = restore(snapshot)
+    tune(sim, **{k: branch[k] for k in TUNABLE if k in branch})
+    nudge(sim, *(branch.get(k, 0.0) for k in ("dx", "dy", "dvx", "dvy")))
+    trace = accuracy.run(sim, steps, dt)
+    outside = trace.outside
+    x, y = sim.position()
+    return [int(outside.argmax()) if outside.any() else -1, float(x), float(y),
+            float(trace.penetration.max()) if len(trace) else 0.0]
+
+
+def run_chunk(snapshot, branches, steps, dt):
+    return [run_branch(snapshot, branch, steps, dt) for branch in branches]
+
+
+def perturbations(count, seed=0, position=0.0, speed=0.0, omega=0.0):
+    """``count`` branches jittered by normal noise of the given standard deviations.
+
+    Branch 0 is left unperturbed, as a control.
+    """
+    rng = np.random.default_rng(seed)
+    branches = [{}]
+    for _ in range(count - 1):
+        branch = {}
+        if position:
+            branch["dx"], branch["dy"] = rng.normal(0, position, 2).tolist()
+        if speed:
+            branch["dvx"], branch["dvy"] = rng.normal(0, speed, 2).tolist()
+        if omega:
+            branch["omega"] = float(rng.normal(0, omega))
+        branches.append(branch)
+    return branches
+
+
+def fork(snapshot, branches, steps, dt, workers=None, chunk=CHUNK):
+    """Run every branch from snapshot for ``steps`` steps; rows in branch order.
+
+    A branch is a dict of ``tune`` parameters and ``nudge`` offsets; a given
+    omega is added to the snapshot's spin. Rows are those of ``run_branch``.
+    """
+    branches = [dict(b, omega=snapshot.omega + b["omega"]) if "omega" in b else b
+                for b in branches]
+    chunks = [branches[i:i + chunk] for i in range(0, len(branches), chunk)]
+    if len(chunks) <= 1 or workers == 1:
+        return [row for part in chunks for row in run_chunk(snapshot, part, steps, dt)]
+    pool = ProcessPoolExecutor(max_workers=workers or os.cpu_count())
+    try:
+        futures = [pool.submit(run_chunk, snapshot, part, steps, dt) for part in chunks]
+        return [row for future in futures for row in future.result()]
+    finally:
+        pool.shutdown(cancel_futures=True)
+
+
+def summary(rows, dt):
+    """Escape count and timing over fork rows."""
+    escape = np.array([row[0] for row in rows])
+    escaped = escape[escape >= 0]
+    return {
+        "branches": len(rows),
+        "escaped": int(len(escaped)),
+        "control_escape": int(escape[0]) if len(escape) else -1,
+        "median_escape_s": float(np.median(escaped) * dt) if len(escaped) else math.nan,
+        "max_penetration": float(max((row[3] for row in rows), default=0.0)),
+    }
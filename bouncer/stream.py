@@ -0,0 +1,391 @@
+"""Stream simulation state to other processes over a socket.
+
+``StreamPublisher`` listens on a UNIX domain socket (``unix:PATH``) or a
+TCP port (``HOST:PORT``) and, for every published tick, sends the container
+angle and the position and velocity of every ball to each connected client.
+``StreamClient`` rebuilds the state on the other end, and ``view`` draws it
+in a pygame window, so dashboards and extra renderers cost the simulation
+process nothing but the encoding.
+
+Positions and velocities are quantized to POS_QUANTUM pixels and
+VEL_QUANTUM pixels per second and held as integers. A keyframe carries the
+quantized values; a delta carries the change since the previous tick as
+int16, with any change that does not fit listed separately as an index
+and its new absolute value. Both sides apply the same integer arithmetic,
+so deltas never drift. Payloads are zlib-compressed; keyframes are
+byte-shuffled first (all low bytes, then the next ones), which takes
+another sixth off them, while the small int16 changes compress better
+as they are.
+
+A client gets a keyframe when it connects and every KEY_EVERY ticks after
+that. Sockets are non-blocking. A client that cannot take a message whole
+skips the ticks until its backlog drains, then gets a keyframe, so a slow
+viewer never holds up the simulation.
+
+Every message starts with HEADER: the payload length, the message kind,
+the tick and the angle in radians. HELLO carries the scene as JSON.
+"""
+import json
+import os
+import select
+import socket
+import struct
+import time
+import zlib
+from collections import deque, namedtuple
+
+import numpy as np
+
+HELLO, KEY, DELTA = range(3)
+HEADER = struct.Struct("<IBQd")  # payload length, kind, tick, angle
+COUNTS = struct.Struct("<II")  # balls, changes too large for int16
+
+POS_QUANTUM = 1 / 32  # pixels
+VEL_QUANTUM = 1 / 8  # pixels per second
+KEY_EVERY = 120  # ticks between keyframes
+INT32 = np.iinfo(np.int32)
+
+Snapshot = namedtuple("Snapshot", "tick angle pos vel")
+
+
+def parse_address(address):
+    """(family, address) for ``unix:PATH`` or ``HOST:PORT``."""
+    if address.startswith("unix:"):
+        return socket.AF_UNIX, address[5:]
+    host, _, port = address.rpartition(":")
+    return socket.AF_INET, (host or "localhost", int(port))
+
+
+def scene(sim):
+    """Container and ball geometry of sim, as sent in HELLO."""
+    return {
+        "impl": sim.name,
+        "center": [float(c) for c in sim.center],
+        "hex_radius": sim.hex_radius,
+        "sides": sim.sides,
+        "ball_radius": sim.ball_radius,
+        "pos_quantum": POS_QUANTUM,
+        "vel_quantum": VEL_QUANTUM,
+    }
+
+
+def state(sim):
+    """(angle, positions, velocities) of a Simulation or a BallEngine."""
+    if hasattr(sim, "pos"):
+        return sim.angle, sim.pos, sim.vel
+    return sim.rotation(), [sim.position()], [sim.velocity()]
+
+
+def quantize(pos, vel):
+    """Positions and velocities as an (N, 4) int32 array of quanta."""
+    q = np.hstack((np.asarray(pos, dtype=float) / POS_QUANTUM,
+                   np.asarray(vel, dtype=float) / VEL_QUANTUM))
+    return np.rint(np.clip(q, INT32.min, INT32.max)).astype(np.int32)
+
+
+def shuffle(values):
+    """Bytes of values regrouped by significance, least significant first."""
+    raw = np.ascontiguousarray(values).view(np.uint8)
+    return raw.reshape(-1, values.itemsize).T.tobytes()
+
+
+def unshuffle(data, dtype, count):
+    dtype = np.dtype(dtype)
+    planes = np.frombuffer(data, np.uint8, count * dtype.itemsize)
+    return planes.reshape(dtype.itemsize, count).T.copy().view(dtype).ravel()
+
+
+def message(kind, tick, angle, payload):
+    return HEADER.pack(len(payload), kind, tick, angle) + payload
+
+
+class Encoder:
+    """Turns successive quantized states into KEY and DELTA messages."""
+
+    def __init__(self):
+        self.previous = None
+
+    def key(self, tick, angle, q):
+        self.previous = q
+        payload = COUNTS.pack(len(q), 0) + zlib.compress(shuffle(q.astype("<i4")), 1)
+        return message(KEY, tick, angle, payload)
+
+    def delta(self, tick, angle, q):
+        """DELTA against the last message, or None if the ball count changed."""
+        if self.previous is None or len(q) != len(self.previous):
+            return None
+        change = (q.astype(np.int64) - self.previous).ravel()
+        small = change.astype("<i2")
+        over = np.flatnonzero(small != change)
+        body = (small.tobytes() + over.astype("<u4").tobytes()
+                + q.ravel()[over].astype("<i4").tobytes())
+        self.previous = q
+        return message(DELTA, tick, angle, COUNTS.pack(len(q), len(over)) + zlib.compress(body, 1))
+
+
+class Decoder:
+    """Rebuilds Snapshots from the messages of one stream."""
+
+    def __init__(self):
+        self.meta = None
+        self.q = None
+
+    def apply(self, kind, tick, angle, payload):
+        """Apply one message; return the Snapshot it completes, if any."""
+        if kind == HELLO:
+            self.meta = json.loads(payload)
+            return None
+        n, n_over = COUNTS.unpack_from(payload)
+        body = zlib.decompress(payload[COUNTS.size:])
+        if kind == KEY:
+            self.q = unshuffle(body, "<i4", 4 * n).astype(np.int32).reshape(n, 4)
+        elif self.q is None or len(self.q) != n:
+            return None  # a delta before our first keyframe
+        else:
+            flat = self.q.ravel()
+            flat += np.frombuffer(body, "<i2", 4 * n)
+            at = 8 * n
+            over = np.frombuffer(body, "<u4", n_over, at)
+            flat[over] = np.frombuffer(body, "<i4", n_over, at + 4 * n_over)
+        q = self.q
+        return Snapshot(tick, angle, q[:, :2] * POS_QUANTUM, q[:, 2:] * VEL_QUANTUM)
+
+
+class _Client:
+    def __init__(self, sock):
+        self.sock = sock
+        self.backlog = bytearray()
+        self.needs_key = True
+
+    def flush(self):
+        """Send what is queued; False if the connection is gone."""
+        try:
+            sent = self.sock.send(self.backlog)
+        except BlockingIOError:
+            return True
+        except OSError:
+            return False
+        del self.backlog[:sent]
+        return True
+
+
+class StreamPublisher:
+    """Serve the state of sim to any number of clients."""
+
+    def __init__(self, sim, address, key_every=KEY_EVERY):
+        self.sim = sim
+        self.address = address
+        self.key_every = key_every
+        family, where = parse_address(address)
+        if family == socket.AF_UNIX and os.path.exists(where):
+            os.unlink(where)
+        self._listener = socket.socket(family, socket.SOCK_STREAM)
+        if family == socket.AF_INET:
+            self._listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._listener.bind(where)
+        self._listener.listen()
+        self._listener.setblocking(False)
+        self._path = where if family == socket.AF_UNIX else None
+        self._hello = message(HELLO, 0, 0.0, json.dumps(scene(sim)).encode())
+        self._encoder = Encoder()
+        self._clients = []
+        self.published = 0
+        self.keyframes = 0
+        self.bytes = 0  # state messages queued, over all clients
+        self.balls = 0
+
+    @property
+    def clients(self):
+        return len(self._clients)
+
+    def _accept(self):
+        while True:
+            try:
+                sock, _ = self._listener.accept()
+            except BlockingIOError:
+                return
+            sock.setblocking(False)
+            client = _Client(sock)
+            client.backlog += self._hello
+            self._clients.append(client)
+
+    def publish(self, tick):
+        """Send the current state of sim as tick to every client."""
+        self._accept()
+        if not self._clients:
+            self._encoder.previous = None
+            return
+        angle, pos, vel = state(self.sim)
+        q = quantize(pos, vel)
+        self.balls = len(q)
+
+        ready = []
+        for c in list(self._clients):
+            if not c.flush():
+                self._drop(c)
+            elif c.backlog:
+                c.needs_key = True  # misses this tick; resynced by a keyframe later
+            else:
+                ready.append(c)
+        if not ready:
+            return
+
+        delta = None
+        if not (self.key_every and tick % self.key_every == 0):
+            delta = self._encoder.delta(tick, angle, q)
+        key = None
+        if delta is None or any(c.needs_key for c in ready):
+            key = self._encoder.key(tick, angle, q)
+            self.keyframes += 1
+        self.published += 1
+        for c in ready:
+            data = key if (delta is None or c.needs_key) else delta
+            c.backlog += data
+            c.needs_key = False
+            self.bytes += len(data)
+            if not c.flush():
+                self._drop(c)
+
+    def _drop(self, client):
+        client.sock.close()
+        self._clients.remove(client)
+
+    def close(self):
+        for c in list(self._clients):
+            self._drop(c)
+        self._listener.close()
+        if self._path and os.path.exists(self._path):
+            os.unlink(self._path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class StreamClient:
+    """Connect to a StreamPublisher and rebuild its snapshots."""
+
+    def __init__(self, address, timeout=5.0):
+        family, where = parse_address(address)
+        self.sock = socket.socket(family, socket.SOCK_STREAM)
+        self.sock.settimeout(timeout)
+        self.sock.connect(where)
+        self.decoder = Decoder()
+        self.closed = False
+        self.received = 0  # bytes
+        self._buffer = bytearray()
+        self._messages = deque()
+
+    @property
+    def meta(self):
+        return self.decoder.meta
+
+    def _read(self, timeout):
+        """Receive what arrives within timeout; return the number of bytes."""
+        if self.closed or not select.select([self.sock], [], [], timeout)[0]:
+            return 0
+        data = self.sock.recv(1 << 20)
+        if not data:
+            self.closed = True
+        self.received += len(data)
+        self._buffer += data
+        self._split()
+        return len(data)
+
+    def _split(self):
+        """Move the complete messages in the buffer to the queue."""
+        buffer, at = self._buffer, 0
+        while len(buffer) - at >= HEADER.size:
+            size, kind, tick, angle = HEADER.unpack_from(buffer, at)
+            end = at + HEADER.size + size
+            if len(buffer) < end:
+                break
+            self._messages.append((kind, tick, angle, bytes(buffer[at + HEADER.size:end])))
+            at = end
+        del buffer[:at]
+
+    def poll(self):
+        """Apply everything received so far; return the latest Snapshot or None."""
+        while self._read(0):
+            pass
+        latest = None
+        while self._messages:
+            latest = self.decoder.apply(*self._messages.popleft()) or latest
+        return latest
+
+    def recv(self, timeout=None):
+        """Block for the next Snapshot; None on timeout or once the stream ends."""
+        while True:
+            while self._messages:
+                snapshot = self.decoder.apply(*self._messages.popleft())
+                if snapshot is not None:
+                    return snapshot
+            if not self._read(timeout):
+                return None
+
+    def close(self):
+        self.sock.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def serve(sim, address, dt, steps=0, every=1, key_every=KEY_EVERY):
+    """Step sim in real time, publishing every ``every`` ticks; return the publisher.
+
+    Runs until ``steps`` ticks (0 for no limit) or Ctrl-C.
+    """
+    publisher = StreamPublisher(sim, address, key_every)
+    step, tick, due = sim.step, 0, time.perf_counter()
+    try:
+        while not steps or tick < steps:
+            now = time.perf_counter()
+            if now < due:
+                time.sleep(due - now)
+            step(dt)
+            tick += 1
+            if tick % every == 0:
+                publisher.publish(tick)
+            due += dt
+    except KeyboardInterrupt:
+        pass
+    finally:
+        publisher.close()
+    return publisher
+
+
+def view(address, fps=60):
+    """Draw a published stream in a pygame window until it ends or is closed."""
+    import pygame
+
+    from .impls.base import HEIGHT, WIDTH
+    from .render import Renderer
+
+    client = StreamClient(address)
+    first = client.recv()
+    meta = client.meta
+    if first is None:
+        return
+    pygame.init()
+    screen = pygame.display.set_mode((WIDTH, HEIGHT))
+    pygame.display.set_caption(f"Stream: {meta['impl']} ({address})")
+    clock = pygame.time.Clock()
+    renderer = Renderer(screen, meta["hex_radius"], meta["sides"])
+    renderer.set_coarse(len(first.pos) > 1000)
+
+    snapshot, running = first, True
+    while running and not client.closed:
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                running = False
+        snapshot = client.poll() or snapshot
+        renderer.present(renderer.draw(meta["center"], snapshot.angle, snapshot.pos,
+                                       meta["ball_radius"]))
+        clock.tick(fps)
+    client.close()
+    pygame.quit()
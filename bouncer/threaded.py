@@ -0,0 +1,185 @@
+"""Physics on a worker thread, rendering on the main thread.
+
+In every script one loop polls input, steps physics and renders, so a slow
+``display.flip()`` or a burst of events holds the simulation up with it.
+Here ``PhysicsThread`` steps the simulation at its own fixed rate and
+publishes each finished tick through a ``StateHandoff``. The render loop
+draws from the latest published state and never waits for physics. Input
+reaches physics through a queue: a mouse click posts ``RESET``, the click
+handler of claude.py.
+
+``StateHandoff`` is a double buffer guarded by a sequence counter per slot
+rather than a lock. The writer fills the slot that is not published, with
+its counter odd while it writes, then publishes the slot by storing its
+index. A reader copies the published slot and retries if the counter
+moved in the meantime. That only happens when the reader falls a whole
+tick behind mid-copy, and it never blocks the writer.
+"""
+import queue
+import threading
+import time
+
+import numpy as np
+
+from .impls.base import FPS, HEIGHT, WIDTH
+from .loop import lerp_state
+
+RESET = "reset"
+MAX_LAG = 0.25  # seconds; physics further behind than this skips ahead
+LATE_FACTOR = 1.5  # a tick interval over this many dt counts as late
+
+
+class StateHandoff:
+    """Latest (tick, stamp, angle, positions) from one writer to one reader."""
+
+    def __init__(self, state):
+        angle, pos = state
+        pos = np.asarray(pos, dtype=float)
+        self._pos = [pos.copy(), pos.copy()]
+        self._meta = [(0, time.perf_counter(), angle)] * 2
+        self._seq = [0, 0]
+        self.latest = 0
+
+    def publish(self, tick, state):
+        i = 1 - self.latest
+        self._seq[i] += 1
+        angle, pos = state
+        self._pos[i][...] = pos
+        self._meta[i] = (tick, time.perf_counter(), angle)
+        self._seq[i] += 1
+        self.latest = i
+
+    def read(self, out):
+        """Copy the latest positions into out; return (tick, stamp, angle)."""
+        while True:
+            i = self.latest
+            seq = self._seq[i]
+            meta = self._meta[i]
+            np.copyto(out, self._pos[i])
+            if not seq & 1 and self._seq[i] == seq:
+                return meta
+
+
+class PhysicsThread(threading.Thread):
+    """Step sim every dt seconds of wall time until stopped or ``steps`` ticks."""
+
+    def __init__(self, sim, dt, substeps=1, steps=0):
+        super().__init__(name="physics", daemon=True)
+        self.sim = sim
+        self.dt = dt
+        self.substeps = substeps
+        self.steps = steps
+        self.inputs = queue.SimpleQueue()
+        self.handoff = StateHandoff(sim.render_state())
+        self.ticks = 0
+        self.skipped = 0  # ticks given up after falling MAX_LAG behind
+        self._stopping = threading.Event()
+        # Wall-clock start of every tick, for the rate report
+        self.starts = np.zeros(steps or 1 << 16)
+
+    def stop(self):
+        self._stopping.set()
+
+    def handle(self, command):
+        if command == RESET:
+            self.sim.reset()
+
+    def run(self):
+        sim, dt, inputs, handoff = self.sim, self.dt, self.inputs, self.handoff
+        step, sub_dt = sim.step, dt / self.substeps
+        starts, capacity = self.starts, len(self.starts)
+        due = time.perf_counter()
+        while not self._stopping.is_set() and (not self.steps or self.ticks < self.steps):
+            now = time.perf_counter()
+            if now < due:
+                time.sleep(due - now)
+                now = time.perf_counter()
+            elif now - due > MAX_LAG:
+                self.skipped += int((now - due) / dt)
+                due = now
+            starts[self.ticks % capacity] = now
+
+            while True:
+                try:
+                    command = inputs.get_nowait()
+                except queue.Empty:
+                    break
+                self.handle(command)
+            for _ in range(self.substeps):
+                step(sub_dt)
+            self.ticks += 1
+            handoff.publish(self.ticks, sim.render_state())
+            due += dt
+
+    def report(self):
+        """Achieved tick rate and tick-to-tick interval percentiles."""
+        n = min(self.ticks, len(self.starts))
+        starts = np.sort(self.starts[:n]) if self.ticks > len(self.starts) else self.starts[:n]
+        if n < 2:
+            return None
+        gaps = np.diff(starts)
+        return {
+            "ticks": self.ticks,
+            "rate_hz": (n - 1) / (starts[-1] - starts[0]),
+            "interval_p50_ms": float(np.percentile(gaps, 50)) * 1e3,
+            "interval_p99_ms": float(np.percentile(gaps, 99)) * 1e3,
+            "interval_max_ms": float(gaps.max()) * 1e3,
+            "late": int((gaps > LATE_FACTOR * self.dt).sum()),
+            "skipped": self.skipped,
+        }
+
+
+def run_threaded(sim, dt, steps=0, fps=FPS, substeps=1, dirty_rects=True,
+                 render_delay=0.0):
+    """Like ``run_window``, with physics on a PhysicsThread.
+
+    Frames show the state one tick in the past, interpolated from the two
+    latest ticks by wall-clock time. ``render_delay`` seconds are slept
+    after every present, to stand in for a slow display. Returns the
+    physics report with the render frame rate added.
+    """
+    import pygame
+
+    from .render import Renderer
+
+    pygame.init()
+    screen = pygame.display.set_mode((WIDTH, HEIGHT))
+    pygame.display.set_caption(f"Bouncing Ball in Spinning Hexagon ({sim.name}, threaded)")
+    clock = pygame.time.Clock()
+    renderer = Renderer(screen, sim.hex_radius, sim.sides, dirty_rects=dirty_rects)
+
+    physics = PhysicsThread(sim, dt, substeps, steps)
+    handoff = physics.handoff
+    # Positions of the two ticks being blended, plus one to read into
+    shape = np.shape(sim.render_state()[1])
+    scratch = np.zeros(shape)
+    previous = current = (*handoff.read(scratch), scratch)
+    scratch = np.zeros(shape)
+    frames, start = 0, time.perf_counter()
+    physics.start()
+
+    while physics.is_alive():
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                physics.stop()
+            elif event.type == pygame.MOUSEBUTTONDOWN:
+                physics.inputs.put(RESET)
+
+        tick, stamp, angle = handoff.read(scratch)
+        if tick != current[0]:
+            spare = previous[3] if previous[3] is not current[3] else np.zeros(shape)
+            previous, current, scratch = current, (tick, stamp, angle, scratch), spare
+        alpha = min(max((time.perf_counter() - current[1]) / dt, 0.0), 1.0)
+        angle, positions = lerp_state(previous[2:], current[2:], alpha)
+        renderer.present(renderer.draw(sim.center, angle, positions, sim.ball_radius))
+        frames += 1
+        if render_delay:
+            time.sleep(render_delay)
+        clock.tick(fps)
+
+    physics.join()
+    elapsed = time.perf_counter() - start
+    pygame.quit()
+    report = physics.report() or {}
+    report["render_fps"] = frames / elapsed if elapsed else 0.0
+    return report
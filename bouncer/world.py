@@ -0,0 +1,323 @@
+"""Many spinning containers in one world, with balls free to move between them.
+
+Each container is a regular polygon with its own centre, radius, side count,
+angular velocity and set of open edges (edges with no wall). A ball that
+leaves through an opening falls through open space and can land in, or
+bounce off the outside of, any other container.
+
+Walls are finite segments with two sides, so the half-plane test of
+``bouncer.geometry`` does not apply here. Collisions use the closest point on
+each wall segment, as claude.py's ``check_collision`` does, plus a crossing
+test against the start of the step so that a fast ball whose centre passed
+through a thin wall is sent back to the side it came from. An
+``AABBIndex`` over the containers' bounding boxes gives each ball the few
+containers it can touch, and only their walls are tested. The padded
+per-container edge tables make this one NumPy pass over the candidate
+(ball, container) pairs.
+
+Units are pixels and seconds, as in ``bouncer.engine``.
+"""
+import math
+
+import numpy as np
+
+from .aabb import AABBIndex
+from .engine import FRICTION, GRAVITY, OMEGA
+from .geometry import RegularPolygon
+from .impls.base import FPS
+
+
+class Container:
+    def __init__(self, center, radius, sides=6, omega=OMEGA, angle=0.0, openings=()):
+        self.center = (float(center[0]), float(center[1]))
+        self.polygon = RegularPolygon(sides, radius)
+        self.omega = omega
+        self.angle = angle
+        # Edge i runs from vertex i to vertex i + 1; open edges have no wall
+        self.openings = frozenset(openings)
+
+    @property
+    def radius(self):
+        return self.polygon.radius
+
+    @property
+    def sides(self):
+        return self.polygon.sides
+
+    @classmethod
+    def from_hexagon(cls, hexagon, openings=()):
+        """Container matching a ``Hexagon`` from the claude, perplexity or llama port.
+
+        Those keep the angle in degrees and spin by ``speed`` degrees per
+        frame (claude.py's has no speed attribute and turns at 0.5).
+        """
+        if hasattr(hexagon, "center"):
+            center, radius = hexagon.center, hexagon.radius
+        elif hasattr(hexagon, "center_x"):
+            center, radius = (hexagon.center_x, hexagon.center_y), hexagon.size
+        else:
+            center, radius = (hexagon.x, hexagon.y), hexagon.size
+        omega = math.radians(getattr(hexagon, "speed", 0.5)) * FPS
+        return cls(center, radius, 6, omega, math.radians(hexagon.angle), openings)
+
+    def aabb(self):
+        x, y, r = *self.center, self.radius
+        return (x - r, y - r), (x + r, y + r)
+
+    def vertices(self):
+        return self.polygon.vertices(self.center, self.angle)
+
+
+class World:
+    name = "world"
+
+    def __init__(self, containers, bounds, ball_radius=4, gravity=GRAVITY,
+                 friction=FRICTION):
+        self.containers = list(containers)
+        if not self.containers:
+            raise ValueError("a World needs at least one container")
+        self.bounds = bounds
+        self.ball_radius = ball_radius
+        self.gravity = gravity
+        self.friction = friction
+        boxes = [c.aabb() for c in self.containers]
+        self.index = AABBIndex([lo for lo, _ in boxes], [hi for _, hi in boxes])
+
+        n, sides = len(self.containers), max(c.sides for c in self.containers)
+        self.centers = np.array([c.center for c in self.containers])
+        self.radii = np.array([c.radius for c in self.containers])
+        self.omega = np.array([c.omega for c in self.containers])
+        self.angles = np.array([c.angle for c in self.containers])
+        # Edge tables padded to the largest side count; padding edges and
+        # openings are masked out of the wall test
+        self._start = np.zeros((n, sides, 2))
+        self._edge = np.zeros((n, sides, 2))
+        self._walls = np.zeros((n, sides), dtype=bool)
+        self._normals = np.zeros((n, sides, 2))
+        self._apothem = np.array([c.polygon.apothem for c in self.containers])
+        for i, c in enumerate(self.containers):
+            s, v = c.sides, c.polygon.local_vertices
+            self._start[i, :s] = v
+            self._edge[i, :s] = np.roll(v, -1, axis=0) - v
+            self._walls[i, :s] = [k not in c.openings for k in range(s)]
+            self._normals[i, :s] = c.polygon.normals
+        self._len2 = np.maximum(np.einsum("ijk,ijk->ij", self._edge, self._edge), 1e-12)
+
+        self.pos = np.zeros((0, 2))
+        self.vel = np.zeros((0, 2))
+        self.home = np.zeros(0, dtype=np.intp)  # container each ball is in, or -1
+        self._visited = np.zeros(0, dtype=np.intp)  # last container it was in
+        # Counters: wall contacts and candidate pairs in the last step, and
+        # balls that arrived in a different container, ever
+        self.contacts = 0
+        self.candidates = 0
+        self.transfers = 0
+
+    def __len__(self):
+        return len(self.pos)
+
+    def add_balls(self, container, n, rng, speed=5 * FPS):
+        """Scatter n balls inside a container's inscribed circle."""
+        c = self.containers[container]
+        r = (c.polygon.apothem - self.ball_radius) * np.sqrt(rng.uniform(0, 1, n))
+        theta = rng.uniform(0, 2 * math.pi, n)
+        pos = np.column_stack((c.center[0] + r * np.cos(theta), c.center[1] + r * np.sin(theta)))
+        self.pos = np.concatenate((self.pos, pos))
+        self.vel = np.concatenate((self.vel, rng.uniform(-speed, speed, (n, 2))))
+        self.home = np.concatenate((self.home, np.full(n, container)))
+        self._visited = np.concatenate((self._visited, np.full(n, container)))
+
+    def step(self, dt):
+        start, angles = self.pos.copy(), self.angles.copy()
+        self.angles += self.omega * dt
+        for c, angle in zip(self.containers, self.angles.tolist()):
+            c.angle = angle
+        self.vel[:, 1] += self.gravity * dt
+        self.pos += self.vel * dt
+        self.collide(start, angles)
+        self.confine()
+
+    def collide(self, start, start_angles):
+        """Resolve each ball's deepest contact with a nearby wall segment.
+
+        ``start`` and ``start_angles`` are the positions and container
+        angles at the beginning of the step. A ball whose centre crossed a
+        wall since then is put back on the side it came from, however far
+        it went; otherwise walls are tested by distance to the closest point.
+        """
+        r = self.ball_radius
+        # Boxes around the whole move, so a ball that shot past a wall is
+        # still paired with its container
+        balls, conts = self.index.query(np.minimum(start, self.pos) - r,
+                                        np.maximum(start, self.pos) + r)
+        d, d0 = self.pos[balls] - self.centers[conts], start[balls] - self.centers[conts]
+        reach = (self.radii[conts] + r) ** 2
+        near = ((np.einsum("ij,ij->i", d, d) <= reach)
+                | (np.einsum("ij,ij->i", d0, d0) <= reach))
+        balls, conts, d, d0 = balls[near], conts[near], d[near], d0[near]
+        self.candidates = len(balls)
+
+        # Into each container's own frame, now and at the start of the step
+        c, s = np.cos(self.angles[conts]), np.sin(self.angles[conts])
+        qx, qy = c * d[:, 0] + s * d[:, 1], c * d[:, 1] - s * d[:, 0]
+        c0, s0 = np.cos(start_angles[conts]), np.sin(start_angles[conts])
+        q0x, q0y = c0 * d0[:, 0] + s0 * d0[:, 1], c0 * d0[:, 1] - s0 * d0[:, 0]
+        nx, ny = self._normals[conts, :, 0], self._normals[conts, :, 1]
+        apothem = self._apothem[conts, None]
+
+        # Closest point on every wall of the candidate containers
+        ax, ay = self._start[conts, :, 0], self._start[conts, :, 1]
+        ex, ey = self._edge[conts, :, 0], self._edge[conts, :, 1]
+        len2 = self._len2[conts]
+        t = np.clip(((qx[:, None] - ax) * ex + (qy[:, None] - ay) * ey) / len2, 0, 1)
+        ox, oy = qx[:, None] - (ax + t * ex), qy[:, None] - (ay + t * ey)
+        dist = np.sqrt(ox * ox + oy * oy)
+
+        # A ball that started the step inside a container is held in by its
+        # closed walls as half-planes, like bouncer.geometry, however far it
+        # got. From outside, a wall whose line the centre crossed within the
+        # segment's extent sends it back; otherwise the closest point counts.
+        side1 = qx[:, None] * nx + qy[:, None] * ny - apothem
+        side0 = q0x[:, None] * nx + q0y[:, None] * ny - apothem
+        inside = (side0.max(axis=1) <= 0)[:, None]
+        crossed = (side0 > 0) & (side1 < 0) & ~inside
+        f = np.where(crossed, side0 / np.where(crossed, side0 - side1, 1.0), 0.0)
+        cx, cy = q0x[:, None] + f * (qx - q0x)[:, None], q0y[:, None] + f * (qy - q0y)[:, None]
+        tc = ((cx - ax) * ex + (cy - ay) * ey) / len2
+        crossed &= (tc >= 0) & (tc <= 1)
+
+        dist = np.where(inside, -side1, np.where(crossed, side1, dist))
+        dist = np.where(self._walls[conts], dist, np.inf)
+        edge = dist.argmin(axis=1)
+        rows = np.arange(len(edge))
+        depth = r - dist[rows, edge]
+
+        # One contact per ball: its deepest over all candidate containers
+        hit = np.flatnonzero(depth > 0)
+        hit = hit[np.lexsort((-depth[hit], balls[hit]))]
+        hit = hit[np.r_[True, balls[hit][1:] != balls[hit][:-1]]] if len(hit) else hit
+        self.contacts = len(hit)
+        if not len(hit):
+            self._track(balls, conts)
+            return
+
+        b, k, e, depth = balls[hit], conts[hit], edge[hit], depth[hit]
+        c, s, qx, qy = c[hit], s[hit], qx[hit], qy[hit]
+        plane, inside, side1 = crossed[hit, e] | inside[hit, 0], inside[hit, 0], side1[hit, e]
+        ox, oy, gap = ox[hit, e], oy[hit, e], np.maximum(r - depth, 1e-9)
+        mx, my = self._normals[k, e, 0], self._normals[k, e, 1]
+        # Normal from the wall towards the side the ball belongs on (inwards
+        # if its centre sits exactly on the wall)
+        back = np.where(inside, -1.0, 1.0)
+        nx = np.where(plane, back * mx, np.where(r - depth > 1e-9, ox / gap, -mx))
+        ny = np.where(plane, back * my, np.where(r - depth > 1e-9, oy / gap, -my))
+        px = np.where(plane, qx - side1 * mx, qx - ox)  # contact point
+        py = np.where(plane, qy - side1 * my, qy - oy)
+        qx, qy = qx + nx * depth, qy + ny * depth
+
+        # In a corner the first push can leave a ball past the next wall
+        if inside.any():
+            walls, normals = self._walls[k], self._normals[k]
+            reach = qx[:, None] * normals[:, :, 0] + qy[:, None] * normals[:, :, 1]
+            reach = np.where(walls & inside[:, None], reach - self._apothem[k, None] + r, 0.0)
+            second = reach.argmax(axis=1)
+            extra = np.maximum(reach[np.arange(len(hit)), second], 0.0)
+            qx -= normals[np.arange(len(hit)), second, 0] * extra
+            qy -= normals[np.arange(len(hit)), second, 1] * extra
+
+        vx, vy = self.vel[b, 0], self.vel[b, 1]
+        ux, uy = c * vx + s * vy, c * vy - s * vx
+        omega = self.omega[k]
+        wx, wy = -omega * py, omega * px
+        rx, ry = ux - wx, uy - wy
+        vn = rx * nx + ry * ny
+        into = vn < 0
+        scale = np.where(into, self.friction, 1.0)
+        rx = (rx - np.where(into, 2 * vn, 0.0) * nx) * scale
+        ry = (ry - np.where(into, 2 * vn, 0.0) * ny) * scale
+        ux, uy = rx + wx, ry + wy
+
+        cx, cy = self.centers[k, 0], self.centers[k, 1]
+        self.pos[b, 0] = cx + c * qx - s * qy
+        self.pos[b, 1] = cy + s * qx + c * qy
+        self.vel[b, 0] = c * ux - s * uy
+        self.vel[b, 1] = s * ux + c * uy
+        self._track(balls, conts)
+
+    def _track(self, balls, conts):
+        """Update which container each ball is inside and count transfers.
+
+        Runs on the resolved positions, so a ball that bounced off the
+        outside of a container is not counted as having entered it.
+        """
+        d = self.pos[balls] - self.centers[conts]
+        c, s = np.cos(self.angles[conts]), np.sin(self.angles[conts])
+        qx, qy = c * d[:, 0] + s * d[:, 1], c * d[:, 1] - s * d[:, 0]
+        normals = self._normals[conts]
+        reach = qx[:, None] * normals[:, :, 0] + qy[:, None] * normals[:, :, 1]
+        inside = (reach - self._apothem[conts, None]).max(axis=1) <= 0
+        home = np.full(len(self.pos), -1)
+        home[balls[inside]] = conts[inside]
+        arrived = (home >= 0) & (home != self._visited)
+        self.transfers += int(arrived.sum())
+        self._visited[arrived] = home[arrived]
+        self.home = home
+
+    def confine(self):
+        """Bounce balls off the edges of the world."""
+        r = self.ball_radius
+        for axis, size in enumerate(self.bounds):
+            p, v = self.pos[:, axis], self.vel[:, axis]
+            low, high = p < r, p > size - r
+            p[low], p[high] = r, size - r
+            v[low] = np.abs(v[low]) * self.friction
+            v[high] = -np.abs(v[high]) * self.friction
+
+
+def grid_scene(cols=20, rows=15, cell=80, balls=4, ball_radius=4, seed=None):
+    """A world of cols x rows containers of random shape, each with one opening."""
+    rng = np.random.default_rng(seed)
+    containers = []
+    for j in range(rows):
+        for i in range(cols):
+            sides = int(rng.integers(3, 9))
+            radius = rng.uniform(0.3, 0.45) * cell
+            omega = rng.choice((-1, 1)) * rng.uniform(0.2, 1.5)
+            containers.append(Container(((i + 0.5) * cell, (j + 0.5) * cell), radius, sides,
+                                        omega, rng.uniform(0, 2 * math.pi),
+                                        openings=(int(rng.integers(sides)),)))
+    world = World(containers, (cols * cell, rows * cell), ball_radius)
+    for k in range(len(containers)):
+        world.add_balls(k, balls, rng)
+    return world
+
+
+def show(world, dt, steps=0, fps=FPS):
+    """Step world in a pygame window, redrawing everything each frame."""
+    import pygame
+
+    pygame.init()
+    screen = pygame.display.set_mode(tuple(int(b) for b in world.bounds))
+    pygame.display.set_caption(f"{len(world.containers)} containers, {len(world)} balls")
+    clock = pygame.time.Clock()
+    radius, done = int(world.ball_radius), 0
+    running = True
+    while running and (not steps or done < steps):
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                running = False
+        world.step(dt)
+        done += 1
+
+        screen.fill((0, 0, 0))
+        for c in world.containers:
+            points = c.vertices().tolist()
+            for k in range(c.sides):
+                if k not in c.openings:
+                    pygame.draw.line(screen, (255, 255, 255), points[k],
+                                     points[(k + 1) % c.sides], 2)
+        for x, y in world.pos.tolist():
+            pygame.draw.circle(screen, (255, 0, 0), (int(x), int(y)), radius)
+        pygame.display.flip()
+        clock.tick(fps)
+    pygame.quit()